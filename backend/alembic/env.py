@@ -88,7 +88,9 @@ def run_migrations_online() -> None:
             transaction_per_migration=False
         )
 
-        context.run_migrations()
+        # SQLAlchemy 2.x não faz autocommit: sem a transação nada é gravado
+        with context.begin_transaction():
+            context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,26 @@
+"""Index participants.name (login e entrada no evento filtram por nome)
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # a tabela pode ainda não existir (criada pelo create_all no startup)
+    inspector = sa.inspect(op.get_bind())
+    if 'participants' in inspector.get_table_names():
+        op.execute("CREATE INDEX IF NOT EXISTS ix_participants_name ON participants (name)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_participants_name")
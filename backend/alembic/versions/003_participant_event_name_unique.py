@@ -0,0 +1,66 @@
+"""Unique (event_id, name) em participants (entrada no evento via ON CONFLICT)
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'participants' not in inspector.get_table_names():
+        return
+
+    # duplicados criados por joins simultâneos: mantém o mais antigo e
+    # renomeia os demais ("Ana (2)"), preservando as avaliações de cada um.
+    # O sufixo pula nomes já usados no evento (um "Ana (2)" legítimo, por
+    # exemplo), senão o índice único abaixo falharia.
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text("""
+        SELECT id, event_id, name FROM (
+            SELECT id, event_id, name, row_number() OVER (
+                PARTITION BY event_id, name ORDER BY created_at, id
+            ) AS rn
+            FROM participants
+            WHERE event_id IS NOT NULL
+        ) d
+        WHERE d.rn > 1
+        ORDER BY event_id, name, rn
+    """)).fetchall()
+
+    taken = {}
+    for participant_id, event_id, name in duplicates:
+        if event_id not in taken:
+            taken[event_id] = set(bind.execute(
+                sa.text("SELECT name FROM participants WHERE event_id = :event_id"),
+                {"event_id": event_id},
+            ).scalars())
+
+        suffix = 2
+        while f"{name} ({suffix})" in taken[event_id]:
+            suffix += 1
+        new_name = f"{name} ({suffix})"
+        taken[event_id].add(new_name)
+
+        bind.execute(
+            sa.text("UPDATE participants SET name = :name WHERE id = :id"),
+            {"name": new_name, "id": participant_id},
+        )
+
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_participants_event_name "
+        "ON participants (event_id, name)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS uq_participants_event_name")
@@ -0,0 +1,36 @@
+"""idempotency_key em evaluations (envio em lote idempotente)
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'evaluations' not in inspector.get_table_names():
+        return
+
+    columns = [col['name'] for col in inspector.get_columns('evaluations')]
+    if 'idempotency_key' not in columns:
+        op.add_column('evaluations', sa.Column('idempotency_key', sa.String(64), nullable=True))
+
+    # NULLs não conflitam: avaliações enviadas uma a uma ficam sem chave
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_evaluations_idempotency_key "
+        "ON evaluations (idempotency_key)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS uq_evaluations_idempotency_key")
+    op.drop_column('evaluations', 'idempotency_key')
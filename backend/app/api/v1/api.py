@@ -5,6 +5,7 @@ from app.api.v1.endpoints import rounds
 from app.api.v1.endpoints import auth
 from app.api.v1.endpoints import participants
 from app.api.v1.endpoints import results
+from app.api.v1.endpoints import metrics
 
 api_router = APIRouter()
 
@@ -37,3 +38,8 @@ api_router.include_router(
     participants.router,
     tags=["Participants"]
 )
+
+api_router.include_router(
+    metrics.router,
+    tags=["Metrics"]
+)
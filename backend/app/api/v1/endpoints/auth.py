@@ -1,11 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from uuid import UUID
 
 from app.models.participant import Participant, UserRole
-from app.core.database import get_db
-from app.core.security import verify_password
+from app.core.database import get_async_db
+from app.core.security import PasswordCheckBusy, login_throttle, needs_rehash, password_hasher
+from app.core.tokens import issue_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -17,19 +19,54 @@ class LoginResponse(BaseModel):
     participant_id: UUID
     name: str
     is_sommelier: bool
+    token: str
 
 @router.post("/login", response_model=LoginResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(Participant).filter(
-        Participant.name == payload.name,
-        Participant.role == UserRole.SOMMELIER
-    ).first()
+async def login(payload: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
+    client_ip = request.client.host if request.client else "unknown"
 
-    if not user or not user.password_hash or not verify_password(payload.password, user.password_hash):
+    retry_after = login_throttle.retry_after(payload.name, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    user = await db.scalar(
+        select(Participant)
+        .filter(Participant.name == payload.name, Participant.role == UserRole.SOMMELIER)
+        .limit(1)
+    )
+
+    try:
+        ok = bool(user and user.password_hash) and await password_hasher.verify(
+            payload.name, payload.password, user.password_hash
+        )
+    except PasswordCheckBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many logins in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    if not ok:
+        login_throttle.failure(payload.name, client_ip)
         raise HTTPException(status_code=401, detail="Nome ou senha inválidos")
 
+    login_throttle.success(payload.name)
+
+    # custo do bcrypt mudou (BCRYPT_ROUNDS): regrava o hash com a senha já validada
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await password_hasher.hash(payload.password)
+            await db.commit()
+        except PasswordCheckBusy:
+            pass
+
     return LoginResponse(
         participant_id=user.id,
         name=user.name,
-        is_sommelier=True
+        is_sommelier=True,
+        token=issue_token(user.id, user.event_id, UserRole.SOMMELIER),
     )
@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core import config
+from app.core.database import get_async_db
 from app.schemas.evaluation import EvaluationCreate, EvaluationResponse
-from app.services.evaluation_service import EvaluationService
+from app.services.evaluation_service import (
+    CREATED,
+    DUPLICATE,
+    REJECTED,
+    EvaluationService,
+)
 from uuid import UUID
-from typing import List
+from typing import Any, Dict, List, Optional
 from app.models.evaluation import Evaluation
 from app.models.round import Round
 
@@ -15,24 +23,106 @@ router = APIRouter()
     "/evaluations",
     response_model=EvaluationResponse
 )
-def create_evaluation(
+async def create_evaluation(
     payload: EvaluationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        return EvaluationService.create(db, payload)
+        return await db.run_sync(
+            lambda session: EvaluationService.create(session, payload)
+        )
     except ValueError as e:
         raise HTTPException(status_code=409, detail=str(e))
 
+class EvaluationBatchRequest(BaseModel):
+    # cada item: campos de EvaluationCreate + idempotency_key (gerada pelo cliente)
+    items: List[Dict[str, Any]]
+
+
+class EvaluationBatchItemResult(BaseModel):
+    index: int
+    idempotency_key: Optional[str] = None
+    status: str  # created | duplicate | rejected
+    evaluation_id: Optional[UUID] = None
+    score: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class EvaluationBatchResponse(BaseModel):
+    created: int
+    duplicates: int
+    rejected: int
+    results: List[EvaluationBatchItemResult]
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+@router.post("/evaluations/batch", response_model=EvaluationBatchResponse)
+async def create_evaluations_batch(
+    payload: EvaluationBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Avaliações enfileiradas offline, enviadas de uma vez. Itens inválidos
+    são rejeitados individualmente; reenviar um item (mesma
+    idempotency_key) devolve `duplicate` com o id já gravado.
+    """
+    if len(payload.items) > config.EVALUATION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {config.EVALUATION_BATCH_MAX_ITEMS} items)"
+        )
+
+    results = {}
+    keys = {}
+    valid = []
+    for index, item in enumerate(payload.items):
+        key = item.get("idempotency_key")
+        keys[index] = key if isinstance(key, str) else None
+        if not isinstance(key, str) or not 0 < len(key) <= 64:
+            results[index] = {"status": REJECTED, "detail": "idempotency_key: obrigatória (até 64 caracteres)"}
+            continue
+        try:
+            evaluation = EvaluationCreate.model_validate(
+                {k: v for k, v in item.items() if k != "idempotency_key"}
+            )
+        except ValidationError as e:
+            results[index] = {"status": REJECTED, "detail": _validation_detail(e)}
+            continue
+        valid.append((index, key, evaluation))
+
+    if valid:
+        try:
+            results.update(
+                await db.run_sync(lambda session: EvaluationService.submit_batch(session, valid))
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    items = [
+        EvaluationBatchItemResult(index=index, idempotency_key=keys[index], **results[index])
+        for index in range(len(payload.items))
+    ]
+    return EvaluationBatchResponse(
+        created=sum(item.status == CREATED for item in items),
+        duplicates=sum(item.status == DUPLICATE for item in items),
+        rejected=sum(item.status == REJECTED for item in items),
+        results=items,
+    )
+
+
 @router.get("/evaluations/answered-rounds", response_model=List[UUID])
-def answered_rounds(participant_id: UUID, event_id: UUID, db: Session = Depends(get_db)):
-    rows = (
-        db.query(Evaluation.round_id)
+async def answered_rounds(participant_id: UUID, event_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    rows = await db.scalars(
+        select(Evaluation.round_id)
         .join(Round, Evaluation.round_id == Round.id)
         .filter(Evaluation.participant_id == participant_id, Round.event_id == event_id)
         .distinct()
-        .all()
     )
-    return [row[0] for row in rows]
+    return rows.all()
 
 
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
+from app.core import broker
+from app.core.state_version import event_versions
+from app.core.tokens import revoke_event
+from app.services.dashboard_service import DashboardService
 from app.services.event_service import EventService
+from app.services.leaderboard_service import LeaderboardService
+from app.services.certificate_jobs import DONE, CertificateJob, certificate_jobs
 from app.schemas.event import EventAnswerKeyItem, EventWinnersResponse, EventRankingResponse
 
 from app.models.event import Event
@@ -10,6 +19,10 @@ from typing import List, Optional
 from uuid import UUID
 from app.models.round import Round
 from pydantic import BaseModel
+import asyncio
+from datetime import datetime
+
+SSE_KEEPALIVE_SECONDS = 15
 
 router = APIRouter()
 
@@ -46,8 +59,10 @@ def get_event_answer_key(event_id: UUID, db: Session = Depends(get_db)) -> List[
 
 
 @router.get("/events/{event_id}/winner", response_model=EventWinnersResponse)
-def get_event_winner(event_id: UUID, db: Session = Depends(get_db)):
-    winners = EventService.get_event_winners(db, event_id)
+async def get_event_winner(event_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    winners = await db.run_sync(
+        lambda session: EventService.get_event_winners(session, event_id)
+    )
 
     if not winners:
         raise HTTPException(status_code=404, detail="No winner found for this event")
@@ -59,13 +74,33 @@ def get_event_winner(event_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/events/{event_id}/ranking", response_model=List[EventRankingResponse])
-def get_event_ranking(event_id: UUID, db: Session = Depends(get_db)):
-    return EventService.get_event_ranking(db, event_id)
+async def get_event_ranking(
+    event_id: UUID,
+    response: Response,
+    limit: Optional[int] = Query(3, ge=1),
+    offset: int = Query(0, ge=0),
+    full: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Ranking do evento (posições densas, empates dividem a posição).
+    Por padrão retorna o pódio (limit=3); use full=true ou limit/offset
+    para paginar a tabela completa.
+    """
+    leaderboard = await db.run_sync(
+        lambda session: LeaderboardService.get(session, event_id)
+    )
+    response.headers["X-Total-Count"] = str(len(leaderboard))
+
+    end = offset + limit if not full else None
+    return leaderboard[offset:end]
 
 
 @router.get("/events", response_model=List[EventResponse])
-def list_events(db: Session = Depends(get_db)):
-    results = db.query(Event).order_by(Event.created_at.desc()).all()
+async def list_events(db: AsyncSession = Depends(get_async_db)):
+    results = (
+        await db.scalars(select(Event).order_by(Event.created_at.desc()))
+    ).all()
     return [
         EventResponse(
             id=r.id, name=r.name, access_code=r.access_code, is_open=r.is_open
@@ -80,6 +115,7 @@ def create_event(payload: EventCreateRequest, db: Session = Depends(get_db)):
     db.add(event)
     db.commit()
     db.refresh(event)
+    event_versions.bump(event.id)
     return EventResponse(
         id=event.id,
         name=event.name,
@@ -103,6 +139,7 @@ def update_event(
     db.add(event)
     db.commit()
     db.refresh(event)
+    event_versions.bump(event.id)
 
     return EventResponse(
         id=event.id,
@@ -118,10 +155,19 @@ def set_event_open(event_id: UUID, open: bool, db: Session = Depends(get_db)):
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
+    was_open = event.is_open
     event.is_open = open
     db.add(event)
     db.commit()
     db.refresh(event)
+    version = event_versions.bump(event.id)
+
+    if was_open != event.is_open:
+        broker.publish(
+            event.id,
+            broker.EVENT_OPENED if event.is_open else broker.EVENT_CLOSED,
+            version=version,
+        )
 
     return {"id": event.id, "is_open": event.is_open}
 
@@ -134,6 +180,8 @@ def delete_event(event_id: UUID, db: Session = Depends(get_db)):
 
     db.delete(event)
     db.commit()
+    event_versions.bump(event_id)
+    revoke_event(event_id)
     return None
 
 
@@ -143,13 +191,20 @@ class OpenRoundResponse(BaseModel):
     position: int
 
 
+class EventStatusResponse(BaseModel):
+    event_id: UUID
+    is_open: bool
+    open_round: Optional[OpenRoundResponse] = None
+    version: int
+
+
 @router.get("/events/{event_id}/open-round", response_model=OpenRoundResponse)
-def get_open_round(event_id: UUID, db: Session = Depends(get_db)):
-    round_obj = (
-        db.query(Round)
+async def get_open_round(event_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    round_obj = await db.scalar(
+        select(Round)
         .filter(Round.event_id == event_id, Round.is_open.is_(True))
         .order_by(Round.position.asc())
-        .first()
+        .limit(1)
     )
     if not round_obj:
         raise HTTPException(status_code=404, detail="No open round for this event")
@@ -159,6 +214,84 @@ def get_open_round(event_id: UUID, db: Session = Depends(get_db)):
     )
 
 
+@router.get("/events/{event_id}/status", response_model=EventStatusResponse)
+async def get_event_status(
+    event_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Status enxuto do evento para clientes em polling.
+    Responde 304 via If-None-Match sem consultar o banco enquanto a
+    versão do evento não mudar (a Session só conecta na primeira query).
+    """
+    # lê a versão ANTES da query: se mudar no meio, o cliente só revalida de novo
+    version = event_versions.get(event_id)
+    etag = event_versions.etag(event_id, version)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return Response(
+                status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"}
+            )
+
+    row = (
+        await db.execute(
+            select(Event.is_open, Round)
+            .outerjoin(Round, (Round.event_id == Event.id) & Round.is_open.is_(True))
+            .filter(Event.id == event_id)
+            .order_by(Round.position.asc())
+            .limit(1)
+        )
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    is_open, round_obj = row
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    return EventStatusResponse(
+        event_id=event_id,
+        is_open=is_open,
+        open_round=OpenRoundResponse(
+            id=round_obj.id, name=round_obj.name, position=round_obj.position
+        ) if round_obj else None,
+        version=version,
+    )
+
+
+class RoundDashboardItem(BaseModel):
+    round_id: UUID
+    name: str
+    position: int
+    is_open: bool
+    answer_released: bool
+    submissions: int
+    has_answer_key: bool
+    average_score: Optional[float] = None
+    max_score: Optional[int] = None
+
+
+class EventDashboardResponse(BaseModel):
+    event_id: UUID
+    rounds: List[RoundDashboardItem]
+
+
+@router.get("/events/{event_id}/dashboard", response_model=EventDashboardResponse)
+async def get_event_dashboard(event_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """
+    Painel do sommelier: envios, gabarito e média/máximo de score por
+    round. Servido de contadores em memória (ver DashboardService).
+    """
+    rounds = await db.run_sync(lambda session: DashboardService.get(session, event_id))
+    return EventDashboardResponse(event_id=event_id, rounds=rounds)
+
+
 @router.post("/events/{event_id}/close")
 def close_event(event_id: UUID, db: Session = Depends(get_db)):
     try:
@@ -166,3 +299,107 @@ def close_event(event_id: UUID, db: Session = Depends(get_db)):
         return {"message": "Evento fechado com sucesso."}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/events/{event_id}/stream")
+async def stream_event(event_id: UUID, request: Request):
+    """
+    Canal Server-Sent Events do evento.
+    Substitui o polling de GET /events: o cliente recebe event_closed,
+    round_opened, round_closed e answer_released assim que acontecem.
+    """
+    channel = broker.get_broker()
+    queue = channel.subscribe(event_id)
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=SSE_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # comentário SSE mantém proxies/load balancers com a conexão aberta
+                    yield ": keep-alive\n\n"
+                    continue
+                yield broker.format_sse(message)
+        finally:
+            channel.unsubscribe(event_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class CertificateJobResponse(BaseModel):
+    job_id: str
+    status: str  # "queued" | "running" | "done" | "failed"
+    total: int
+    done: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+
+
+def _certificate_job_response(job: CertificateJob) -> CertificateJobResponse:
+    return CertificateJobResponse(
+        job_id=job.id,
+        status=job.status,
+        total=job.total,
+        done=job.done,
+        created_at=datetime.fromtimestamp(job.created_at),
+        finished_at=datetime.fromtimestamp(job.finished_at) if job.finished_at else None,
+        error=job.error,
+        download_url=(
+            f"/api/v1/events/{job.event_id}/certificates/{job.id}/download"
+            if job.status == DONE
+            else None
+        ),
+    )
+
+
+@router.post(
+    "/events/{event_id}/certificates",
+    response_model=CertificateJobResponse,
+    status_code=202,
+)
+def create_certificates(event_id: UUID, db: Session = Depends(get_db)):
+    """
+    Gera, em segundo plano, o PDF de resultado de todos os participantes
+    do evento em um ZIP. Acompanhe pelo status e baixe quando concluir.
+    """
+    if not db.query(Event.id).filter(Event.id == event_id).first():
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    return _certificate_job_response(certificate_jobs.submit(event_id))
+
+
+@router.get(
+    "/events/{event_id}/certificates/{job_id}",
+    response_model=CertificateJobResponse,
+)
+def get_certificates_job(event_id: UUID, job_id: str):
+    job = certificate_jobs.get(job_id, event_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Certificates job not found")
+    return _certificate_job_response(job)
+
+
+@router.get("/events/{event_id}/certificates/{job_id}/download")
+def download_certificates(event_id: UUID, job_id: str):
+    job = certificate_jobs.get(job_id, event_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Certificates job not found")
+    if job.status != DONE:
+        raise HTTPException(status_code=409, detail="Certificates not ready yet")
+
+    # FileResponse envia o ZIP do disco em blocos
+    return FileResponse(
+        job.zip_path,
+        media_type="application/zip",
+        filename=f"certificados-{event_id}.zip",
+    )
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from app.core.db_pool import pool_metrics
+
+
+router = APIRouter(prefix="/metrics")
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics():
+    """
+    Estado dos pools de conexão: espera por checkout (ms), conexões em
+    uso / overflow e timeouts. O pool async só aparece depois da primeira
+    requisição que o usa.
+    """
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
@@ -1,70 +1,198 @@
-from fastapi import APIRouter, Depends, Query
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
 from app.schemas.results import EvaluationResultResponse
-from app.services.results_service import build_participant_result
-from app.dependencies import get_current_participant
-from app.services.pdf_result_renderer import ResultPdfRenderer
-from app.services.pdf_generator import PdfGenerator
-from fastapi.responses import Response
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.dependencies import get_current_participant
-from app.services.results_service import get_my_results, get_my_event_result
-import time
+from app.dependencies import get_current_participant_async
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import config
+from app.core.database import SessionLocal, get_async_db
+from app.services.pdf_jobs import DONE, FAILED, PdfJob, PdfQueueFull, pdf_jobs
+from app.services.pdf_result_renderer import STYLESHEET_PATH
+from app.services.results_service import (
+    build_result_report_html,
+    cached_result,
+    get_cached_event_results,
+    get_cached_participant_result,
+    get_my_event_result,
+    get_my_event_state,
+    results_cache_key,
+)
 
 
 router = APIRouter(prefix="/results", tags=["Results"])
 
 
 @router.get("/my-evaluation", response_model=EvaluationResultResponse)
-def my_evaluation_result(
+async def my_evaluation_result(
     round_id: str = Query(...),
-    db: Session = Depends(get_db),
-    participant=Depends(get_current_participant),
+    db: AsyncSession = Depends(get_async_db),
+    participant=Depends(get_current_participant_async),
 ):
-    return build_participant_result(participant_id=participant.id, round_id=round_id, db=db)
+    return await db.run_sync(
+        lambda session: get_cached_participant_result(session, participant.id, round_id)
+    )
 
 
-@router.get("/pdf")
-def export_my_result_pdf(
-    db: Session = Depends(get_db),
-    participant=Depends(get_current_participant),
+@router.get("/my-event-evaluations", response_model=List[EvaluationResultResponse])
+async def my_event_evaluation_results(
+    event_id: Optional[UUID] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    participant=Depends(get_current_participant_async),
+):
+    """
+    Resultado de todas as rodadas do evento em uma única chamada
+    (padrão: o evento do participante).
+    """
+    return await db.run_sync(
+        lambda session: get_cached_event_results(
+            session, participant.id, event_id or participant.event_id
+        )
+    )
+
+
+PDF_HEADERS = {"Content-Disposition": "attachment; filename=Resultado-avaliacao.pdf"}
+
+
+class PdfJobResponse(BaseModel):
+    job_id: str
+    status: str  # "queued" | "running" | "done" | "failed"
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+
+
+def _job_response(job: PdfJob) -> PdfJobResponse:
+    status = job.status
+    return PdfJobResponse(
+        job_id=job.id,
+        status=status,
+        created_at=datetime.fromtimestamp(job.created_at),
+        finished_at=datetime.fromtimestamp(job.finished_at) if job.finished_at else None,
+        error=job.error,
+        download_url=f"/api/v1/results/pdf-jobs/{job.id}/download" if status == DONE else None,
+    )
+
+
+def _build_report_html(participant_id, pe, inline_css: bool = True) -> str:
+    """
+    Roda no threadpool: consultas pelo engine síncrono, montagem dos
+    resultados, template e imagens fora do event loop.
+    """
+    db = SessionLocal()
+    try:
+        return build_result_report_html(db, participant_id, pe, inline_css=inline_css)
+    finally:
+        db.close()
+
+
+def _submit_pdf_job(participant, pe, event_is_open) -> PdfJob:
+    # no threadpool: pdf_jobs.submit monta o HTML antes de enfileirar
+    try:
+        # evento fechado: o PDF só muda com recálculo, então pode vir do cache
+        return pdf_jobs.submit(
+            participant.id,
+            results_cache_key("pdf", participant.id, pe.event_id, event_is_open),
+            lambda: _build_report_html(participant.id, pe, inline_css=False),
+            stylesheet=STYLESHEET_PATH,
+        )
+    except PdfQueueFull:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many PDFs being generated, try again shortly",
+            headers={"Retry-After": "5"},
+        )
+
+
+@router.post("/pdf-jobs", response_model=PdfJobResponse, status_code=202)
+async def create_pdf_job(
+    db: AsyncSession = Depends(get_async_db),
+    participant=Depends(get_current_participant_async),
 ):
-    t0 = time.time()
-    results = get_my_results(db, participant.id)
-    pe = get_my_event_result(db, participant.id)
-
-    t1 = time.time()
-
-    html = ResultPdfRenderer.render(
-        participant_name=participant.name,
-        results=results,
-        score_total=pe.score_total,
-        score_max_total=pe.score_max_total,
-        percentual=pe.percentual,
-        badge=pe.badge,
+    pe, event_is_open = await db.run_sync(
+        lambda session: get_my_event_state(session, participant.id)
     )
+    job = await run_in_threadpool(_submit_pdf_job, participant, pe, event_is_open)
+    return _job_response(job)
 
-    t2 = time.time()
 
-    pdf = PdfGenerator.from_html(html)
+@router.get("/pdf-jobs/{job_id}", response_model=PdfJobResponse)
+async def get_pdf_job(job_id: str, participant=Depends(get_current_participant_async)):
+    job = pdf_jobs.get(job_id, participant.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="PDF job not found")
+    return _job_response(job)
 
-    t3 = time.time()
 
-    print(f"[PDF] DB: {t1 - t0:.2f}s | HTML: {t2 - t1:.2f}s | PDF: {t3 - t2:.2f}s | TOTAL: {t3 - t0:.2f}s")
+@router.get("/pdf-jobs/{job_id}/download")
+async def download_pdf_job(job_id: str, participant=Depends(get_current_participant_async)):
+    job = pdf_jobs.get(job_id, participant.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="PDF job not found")
 
-    return Response(
-        pdf,
-        media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=Resultado-avaliacao.pdf"},
+    status = job.status
+    if status == FAILED:
+        raise HTTPException(status_code=500, detail=f"PDF generation failed: {job.error}")
+    if status != DONE:
+        raise HTTPException(status_code=409, detail="PDF not ready yet")
+
+    return Response(job.result(), media_type="application/pdf", headers=PDF_HEADERS)
+
+
+@router.get("/pdf")
+async def export_my_result_pdf(
+    db: AsyncSession = Depends(get_async_db),
+    participant=Depends(get_current_participant_async),
+):
+    """
+    Versão síncrona para o frontend atual: enfileira (ou reaproveita) o job
+    e espera o PDF sem ocupar uma thread do threadpool durante a renderização.
+    """
+    pe, event_is_open = await db.run_sync(
+        lambda session: get_my_event_state(session, participant.id)
+    )
+    job = await run_in_threadpool(_submit_pdf_job, participant, pe, event_is_open)
+
+    try:
+        # shield: o timeout desta requisição não cancela o job
+        pdf, _ = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(job.future)),
+            timeout=config.PDF_JOB_TIMEOUT_SECONDS,
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="PDF generation timed out")
+
+    return Response(pdf, media_type="application/pdf", headers=PDF_HEADERS)
+
+
+@router.get("/html", response_class=HTMLResponse)
+async def export_my_result_html(
+    db: AsyncSession = Depends(get_async_db),
+    participant=Depends(get_current_participant_async),
+):
+    """Mesmo relatório do PDF, só o HTML (sem a conversão pelo WeasyPrint)."""
+    pe, event_is_open = await db.run_sync(
+        lambda session: get_my_event_state(session, participant.id)
+    )
+    html = await run_in_threadpool(
+        cached_result,
+        results_cache_key("html", participant.id, pe.event_id, event_is_open),
+        lambda: _build_report_html(participant.id, pe),
     )
+    return HTMLResponse(html)
 
 
 @router.get("/my-event")
-def my_event_result(
-    db: Session = Depends(get_db),
-    participant=Depends(get_current_participant),
+async def my_event_result(
+    db: AsyncSession = Depends(get_async_db),
+    participant=Depends(get_current_participant_async),
 ):
-    pe = get_my_event_result(db, participant.id)
+    pe = await db.run_sync(lambda session: get_my_event_result(session, participant.id))
 
     return {
         "total_score": pe.score_total,
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.round_service import RoundService
 from app.services.score_service import ScoreService
+from app.core import broker
+from app.core.state_version import event_versions
 from app.schemas.ranking import RoundRankingItem
 from app.schemas.winner import RoundWinner
 from app.schemas.round import RoundCreateRequest, RoundUpdateRequest, RoundResponse
@@ -45,41 +48,32 @@ def recalculate_scores(
     "/rounds/{round_id}/ranking",
     response_model=List[RoundRankingItem]
 )
-def get_round_ranking(
+async def get_round_ranking(
     round_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return RoundService.get_round_ranking(db, round_id)
+    return await db.run_sync(
+        lambda session: RoundService.get_round_ranking(session, round_id)
+    )
 
 @router.get(
     "/rounds/{round_id}/winner",
     response_model=List[RoundWinner]
 )
-def get_round_winner(
+async def get_round_winner(
     round_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return RoundService.get_round_winner(db, round_id)
+    return await db.run_sync(
+        lambda session: RoundService.get_round_winner(session, round_id)
+    )
 
 # CRUD for rounds
-@router.get("/rounds")
-def list_rounds(event_id: UUID, db: Session = Depends(get_db)):
-    rounds = db.query(Round).filter(Round.event_id == event_id).order_by(Round.position.asc()).all()
-    result = []
-    for r in rounds:
-        wine = db.query(Wine).filter(Wine.round_id == r.id).first()
-        result.append(RoundResponse(
-            id=r.id,
-            name=r.name,
-            position=r.position,
-            is_open=r.is_open,
-            answer_released=r.answer_released,
-            event_id=r.event_id,
-            wine_grapes=wine.grapes if wine else None,
-            wine_country=wine.country.value if wine and wine.country else None,
-            wine_vintage=wine.vintage if wine else None
-        ))
-    return result
+@router.get("/rounds", response_model=List[RoundResponse])
+async def list_rounds(event_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(
+        lambda session: RoundService.list_rounds(session, event_id)
+    )
 
 @router.post("/rounds", response_model=RoundResponse, status_code=201)
 def create_round(payload: RoundCreateRequest, db: Session = Depends(get_db)):
@@ -107,6 +101,12 @@ def create_round(payload: RoundCreateRequest, db: Session = Depends(get_db)):
         )
         db.add(wine)
         db.commit()
+
+    version = event_versions.bump(r.event_id)
+    if r.is_open:
+        broker.publish(
+            r.event_id, broker.ROUND_OPENED, round_id=r.id, version=version
+        )
     
     return RoundResponse(
         id=r.id,
@@ -126,36 +126,50 @@ def update_round(round_id: UUID, payload: RoundUpdateRequest, db: Session = Depe
     if not r:
         raise HTTPException(status_code=404, detail="Round not found")
 
+    was_open = r.is_open
+    was_released = r.answer_released
+
     if payload.name is not None:
         r.name = payload.name
     if payload.position is not None:
         r.position = payload.position
     if payload.is_open is not None:
         r.is_open = payload.is_open
+    if payload.answer_released is not None:
+        r.answer_released = payload.answer_released
 
     db.add(r)
     db.commit()
     db.refresh(r)
-    
-    wine = db.query(Wine).filter(Wine.round_id == r.id).first()
+    version = event_versions.bump(r.event_id)
 
-    return RoundResponse(
-        id=r.id,
-        name=r.name,
-        position=r.position,
-        is_open=r.is_open,
-        answer_released=r.answer_released,
-        event_id=r.event_id,
-        wine_grapes=wine.grapes if wine else None,
-        wine_country=wine.country.value if wine and wine.country else None,
-        wine_vintage=wine.vintage if wine else None
-    )
+    if r.is_open != was_open:
+        broker.publish(
+            r.event_id,
+            broker.ROUND_OPENED if r.is_open else broker.ROUND_CLOSED,
+            round_id=r.id,
+            version=version,
+        )
+    if r.answer_released and not was_released:
+        broker.publish(
+            r.event_id, broker.ANSWER_RELEASED, round_id=r.id, version=version
+        )
+
+    return RoundService.to_response(r, RoundService.has_answer_key(db, r.id))
 
 @router.delete("/rounds/{round_id}", status_code=204)
 def delete_round(round_id: UUID, db: Session = Depends(get_db)):
     r = db.query(Round).filter(Round.id == round_id).first()
     if not r:
         raise HTTPException(status_code=404, detail="Round not found")
+    event_id, was_open = r.event_id, r.is_open
     db.delete(r)
     db.commit()
+    version = event_versions.bump(event_id)
+    ScoreService.scores_changed(event_id)
+
+    if was_open:
+        broker.publish(
+            event_id, broker.ROUND_CLOSED, round_id=round_id, version=version
+        )
     return None
\ No newline at end of file
@@ -0,0 +1,117 @@
+import base64
+import io
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.core import config
+
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+
+
+class AssetRegistry:
+    """
+    Arquivos de `app/assets` lidos e codificados em base64 uma única vez.
+
+    Cada variante (arquivo + tamanho de exibição) fica em memória; com
+    `scale` > 0 a imagem é reduzida para o tamanho em que é exibida
+    (vezes `scale`, para manter nitidez na impressão), o que encolhe
+    bastante o HTML/PDF. Arquivos alterados no disco são recarregados:
+    o mtime é conferido no máximo a cada `reload_interval` segundos.
+    """
+
+    def __init__(self, directory: Path, scale: float, reload_interval: float):
+        self.directory = Path(directory)
+        self.scale = scale
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._variants = {}  # (nome, largura, altura) -> base64
+        self._mtimes = {}  # nome -> mtime do arquivo quando foi codificado
+        self._last_check = time.monotonic()
+        # muda a cada recarga; quem guarda HTML com as imagens usa na chave
+        self.generation = 0
+
+    def preload(self, variants) -> None:
+        for name, width, height in variants:
+            self.base64(name, width=width, height=height)
+
+    def base64(self, name: str, width: Optional[int] = None, height: Optional[int] = None) -> str:
+        self._check_reload()
+
+        key = (name, width, height)
+        encoded = self._variants.get(key)
+        if encoded is None:
+            encoded = self._encode(name, width, height)
+            with self._lock:
+                self._variants[key] = encoded
+        return encoded
+
+    def data_uri(self, name: str, width: Optional[int] = None, height: Optional[int] = None) -> str:
+        return f"data:image/png;base64,{self.base64(name, width=width, height=height)}"
+
+    def _encode(self, name: str, width: Optional[int], height: Optional[int]) -> str:
+        path = self.directory / name
+        mtime = os.stat(path).st_mtime
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        if self.scale > 0 and (width or height):
+            data = _downscale(data, width, height, self.scale)
+
+        with self._lock:
+            self._mtimes[name] = mtime
+        return base64.b64encode(data).decode("utf-8")
+
+    def _check_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+
+        changed = []
+        for name, mtime in list(self._mtimes.items()):
+            try:
+                if os.stat(self.directory / name).st_mtime != mtime:
+                    changed.append(name)
+            except FileNotFoundError:
+                changed.append(name)
+
+        if changed:
+            with self._lock:
+                for key in [k for k in self._variants if k[0] in changed]:
+                    del self._variants[key]
+                for name in changed:
+                    self._mtimes.pop(name, None)
+                self.generation += 1
+
+
+def _downscale(data: bytes, width: Optional[int], height: Optional[int], scale: float) -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        # Pillow vem com o WeasyPrint; sem ele, usa a imagem original
+        return data
+
+    image = Image.open(io.BytesIO(data))
+    box = (
+        int(width * scale) if width else image.width,
+        int(height * scale) if height else image.height,
+    )
+    if image.width <= box[0] and image.height <= box[1]:
+        return data
+
+    image.thumbnail(box, Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+assets = AssetRegistry(
+    ASSETS_DIR,
+    scale=config.ASSETS_DOWNSCALE,
+    reload_interval=config.ASSETS_RELOAD_INTERVAL_SECONDS,
+)
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import threading
+from typing import Dict, Set, Tuple
+from uuid import UUID
+
+
+# Tipos de notificação enviados pelo canal do evento
+EVENT_OPENED = "event_opened"
+EVENT_CLOSED = "event_closed"
+ROUND_OPENED = "round_opened"
+ROUND_CLOSED = "round_closed"
+ANSWER_RELEASED = "answer_released"
+
+
+class Broker:
+    """
+    Interface de fan-out das notificações de um evento.
+
+    A implementação padrão é em memória (um único worker). Para rodar com
+    mais de um worker basta registrar outra implementação (ex.: Redis
+    pub/sub ou LISTEN/NOTIFY do Postgres) via `set_broker`.
+    """
+
+    def publish(self, event_id, message: dict) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, event_id) -> asyncio.Queue:
+        raise NotImplementedError
+
+    def unsubscribe(self, event_id, queue: asyncio.Queue) -> None:
+        raise NotImplementedError
+
+
+class InMemoryBroker(Broker):
+    """
+    Fan-out in-process.
+
+    `publish` é chamado pelos handlers síncronos (threadpool), então a
+    entrega para as filas asyncio dos assinantes é feita com
+    `call_soon_threadsafe` no loop de cada assinante.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def publish(self, event_id, message: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(event_id), ()))
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._deliver, queue, message)
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, message: dict) -> None:
+        # Assinante lento: descarta a mensagem em vez de crescer sem limite
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+    def subscribe(self, event_id) -> asyncio.Queue:
+        # Deve ser chamado de dentro do loop que vai consumir a fila
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(str(event_id), set()).add(
+                (asyncio.get_running_loop(), queue)
+            )
+        return queue
+
+    def unsubscribe(self, event_id, queue: asyncio.Queue) -> None:
+        key = str(event_id)
+        with self._lock:
+            subscribers = self._subscribers.get(key)
+            if subscribers is None:
+                return
+            for entry in list(subscribers):
+                if entry[1] is queue:
+                    subscribers.discard(entry)
+            if not subscribers:
+                del self._subscribers[key]
+
+
+_broker: Broker = InMemoryBroker()
+
+
+def get_broker() -> Broker:
+    return _broker
+
+
+def set_broker(broker: Broker) -> None:
+    global _broker
+    _broker = broker
+
+
+def publish(event_id: UUID, type: str, **data) -> None:
+    """
+    Publica uma notificação para todos os clientes conectados ao evento.
+    Deve ser chamado somente após o commit da mudança de estado.
+    """
+    message = {"type": type, "event_id": str(event_id)}
+    message.update({k: str(v) if isinstance(v, UUID) else v for k, v in data.items()})
+    get_broker().publish(event_id, message)
+
+
+def format_sse(message: dict) -> str:
+    return f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
@@ -0,0 +1,233 @@
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+from collections import OrderedDict
+
+from app.core import config
+from app.core.state_version import BOOT_ID
+
+
+MISS = object()
+
+
+class VersionedCache:
+    """
+    Cache em memória (por worker) de valores derivados do banco, indexado
+    por chave e versão. Uma versão nova invalida o valor antigo sem
+    precisar de remoção explícita; as chaves menos usadas saem primeiro
+    quando `max_entries` é atingido.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, version):
+        key = str(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return MISS
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, version, value) -> None:
+        key = str(key)
+        with self._lock:
+            current = self._entries.get(key)
+            # não sobrescreve um valor mais novo gravado por outra requisição
+            if current is not None and current[0] > version:
+                return
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._entries.pop(str(key), None)
+
+
+class ResultCache:
+    """
+    Cache LRU de documentos de resultado (dicts, PDFs), limitado pelo
+    tamanho serializado em memória. Com `disk_dir`, o que sai da memória
+    vai para um tier em disco (também LRU) antes de ser descartado.
+
+    Chaves são tuplas cujo terceiro elemento é o event_id, o que permite
+    invalidar tudo de um evento de uma vez. Os arquivos em disco ficam em
+    uma pasta por processo ("<pid>-<BOOT_ID>"): as versões dos scores
+    recomeçam a cada restart, então nada do processo anterior pode ser
+    reaproveitado. Criar o cache não mexe no disco; as pastas de processos
+    encerrados são removidas por `remove_stale_dirs` no startup da API.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: str = None, disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # chave -> bytes serializados
+        self._memory_bytes = 0
+        self._disk = OrderedDict()  # chave -> (caminho, tamanho)
+        self._disk_bytes = 0
+        self._disk_dir = None
+
+        if disk_dir and disk_max_bytes > 0:
+            root = os.path.join(disk_dir, "results-cache")
+            self._disk_dir = os.path.join(root, f"{os.getpid()}-{BOOT_ID}")
+
+    def remove_stale_dirs(self) -> None:
+        """
+        Apaga as pastas de processos que já terminaram. Pastas de processos
+        vivos (outros workers da API) ficam.
+        """
+        if not self._disk_dir:
+            return
+
+        root = os.path.dirname(self._disk_dir)
+        for name in os.listdir(root) if os.path.isdir(root) else ():
+            path = os.path.join(root, name)
+            if path != self._disk_dir and not _process_alive(name.split("-", 1)[0]):
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _event_of(key) -> str:
+        return str(key[2])
+
+    def _disk_path(self, key) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self._disk_dir, f"{self._event_of(key)}-{digest}.pkl")
+
+    def get(self, key):
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return pickle.loads(data)
+
+            disk_entry = self._disk.pop(key, None)
+            if disk_entry is None:
+                return MISS
+
+            path, size = disk_entry
+            self._disk_bytes -= size
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return MISS
+        _remove_file(path)
+
+        # promovido de volta para a memória
+        self._store(key, data)
+        return pickle.loads(data)
+
+    def set(self, key, value) -> None:
+        self._store(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _store(self, key, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+
+        spilled = []
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+
+            while self._memory_bytes > self.max_bytes:
+                old_key, old_data = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old_data)
+                if self._disk_dir:
+                    spilled.append((old_key, old_data))
+
+        for old_key, old_data in spilled:
+            self._spill(old_key, old_data)
+
+    def _spill(self, key, data: bytes) -> None:
+        if len(data) > self.disk_max_bytes:
+            return
+
+        path = self._disk_path(key)
+        try:
+            os.makedirs(self._disk_dir, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        except OSError:
+            return
+
+        removed = []
+        with self._lock:
+            previous = self._disk.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous[1]
+
+            self._disk[key] = (path, len(data))
+            self._disk_bytes += len(data)
+
+            while self._disk_bytes > self.disk_max_bytes:
+                _, (old_path, old_size) = self._disk.popitem(last=False)
+                self._disk_bytes -= old_size
+                removed.append(old_path)
+
+        for old_path in removed:
+            _remove_file(old_path)
+
+    def invalidate_event(self, event_id) -> None:
+        event_id = str(event_id)
+        removed = []
+        with self._lock:
+            for key in [k for k in self._memory if self._event_of(k) == event_id]:
+                self._memory_bytes -= len(self._memory.pop(key))
+            for key in [k for k in self._disk if self._event_of(k) == event_id]:
+                path, size = self._disk.pop(key)
+                self._disk_bytes -= size
+                removed.append(path)
+
+        for path in removed:
+            _remove_file(path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+def _process_alive(pid: str) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except ValueError:
+        return False  # pasta sem pid (formato antigo)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # existe, mas é de outro usuário
+    except OSError:
+        return False
+    return True
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Resultados de eventos fechados (rodadas, resumo e PDF do participante)
+results_cache = ResultCache(
+    max_bytes=config.RESULTS_CACHE_MAX_BYTES,
+    disk_dir=config.RESULTS_CACHE_DIR,
+    disk_max_bytes=config.RESULTS_CACHE_DISK_MAX_BYTES,
+)
@@ -0,0 +1,110 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+# Pools de conexão: engine síncrono (scripts, handlers def) e async
+# (handlers async def).
+DB_POOL_SIZE = env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = env_int("DB_MAX_OVERFLOW", 10)
+ASYNC_DB_POOL_SIZE = env_int("ASYNC_DB_POOL_SIZE", 10)
+ASYNC_DB_MAX_OVERFLOW = env_int("ASYNC_DB_MAX_OVERFLOW", 10)
+# Espera máxima por uma conexão livre (segundos), idade máxima de uma
+# conexão antes de ser reaberta (-1 desliga) e ping antes de cada checkout.
+DB_POOL_TIMEOUT = env_int("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", True)
+# statement_timeout do Postgres em ms (0 = sem limite).
+DB_STATEMENT_TIMEOUT_MS = env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+# Atrás do PgBouncer em transaction pooling: sem pool local (NullPool) e
+# sem prepared statements em cache no asyncpg. O statement_timeout deve
+# ser configurado no role (ALTER ROLE ... SET statement_timeout), já que o
+# PgBouncer não repassa parâmetros de startup.
+DB_PGBOUNCER = env_bool("DB_PGBOUNCER", False)
+
+# Ambiente de desenvolvimento: libera a subida sem TOKEN_SECRET (tokens
+# assinados com chave aleatória, que não sobrevivem a um restart).
+DEV_MODE = env_bool("DEV_MODE", False)
+
+# Tokens de participante (HMAC): chave de assinatura (obrigatória fora do
+# DEV_MODE), validade e se o header antigo X-Participant-Id (consulta ao
+# banco a cada requisição) ainda é aceito.
+TOKEN_SECRET = os.getenv("TOKEN_SECRET") or None
+TOKEN_TTL_SECONDS = env_int("TOKEN_TTL_SECONDS", 12 * 60 * 60)
+AUTH_LEGACY_HEADER = env_bool("AUTH_LEGACY_HEADER", True)
+
+# Senhas (bcrypt): custo dos hashes novos (hashes com outro custo são
+# refeitos no login), threads dedicadas, verificações simultâneas antes
+# de responder 503 e por quanto tempo um login válido dispensa o bcrypt.
+BCRYPT_ROUNDS = env_int("BCRYPT_ROUNDS", 12)
+AUTH_WORKERS = env_int("AUTH_WORKERS", 2)
+AUTH_MAX_PENDING = env_int("AUTH_MAX_PENDING", 16)
+AUTH_CACHE_TTL_SECONDS = env_int("AUTH_CACHE_TTL_SECONDS", 300)
+# Falhas de login permitidas por nome e por IP dentro da janela.
+LOGIN_MAX_ATTEMPTS_PER_NAME = env_int("LOGIN_MAX_ATTEMPTS_PER_NAME", 5)
+LOGIN_MAX_ATTEMPTS_PER_IP = env_int("LOGIN_MAX_ATTEMPTS_PER_IP", 20)
+LOGIN_ATTEMPT_WINDOW_SECONDS = env_int("LOGIN_ATTEMPT_WINDOW_SECONDS", 300)
+
+# Entrada no evento: cache código de acesso -> evento (por worker; mudanças
+# feitas em outro worker aparecem após este tempo).
+EVENT_CODE_CACHE_TTL_SECONDS = env_int("EVENT_CODE_CACHE_TTL_SECONDS", 60)
+
+# Envio de avaliações: cache por rodada do gabarito e das uvas do Wine
+# (por worker; gabarito gravado em outro worker aparece após este tempo).
+ANSWER_KEY_CACHE_TTL_SECONDS = env_int("ANSWER_KEY_CACHE_TTL_SECONDS", 30)
+# Máximo de avaliações por requisição em POST /evaluations/batch.
+EVALUATION_BATCH_MAX_ITEMS = env_int("EVALUATION_BATCH_MAX_ITEMS", 200)
+
+# Header de debug `X-Query-Stats: queries: N, db_ms: X` em todas as respostas.
+METRICS_DEBUG_HEADER = env_bool("METRICS_DEBUG_HEADER", False)
+
+# Painel do sommelier: contadores em memória são reconstruídos do banco a
+# cada N segundos (pega envios recebidos por outros workers).
+DASHBOARD_RESYNC_SECONDS = env_int("DASHBOARD_RESYNC_SECONDS", 10)
+
+# Atualiza ParticipantEvent a cada avaliação enviada / gabarito gravado,
+# além do recálculo completo que acontece no fechamento do round.
+INCREMENTAL_EVENT_TOTALS = env_bool("INCREMENTAL_EVENT_TOTALS", True)
+
+# Cache de resultados de eventos fechados: limite em memória (bytes
+# serializados) e tier opcional em disco (desligado sem RESULTS_CACHE_DIR).
+RESULTS_CACHE_MAX_BYTES = env_int("RESULTS_CACHE_MAX_BYTES", 128 * 1024 * 1024)
+RESULTS_CACHE_DIR = os.getenv("RESULTS_CACHE_DIR") or None
+RESULTS_CACHE_DISK_MAX_BYTES = env_int("RESULTS_CACHE_DISK_MAX_BYTES", 512 * 1024 * 1024)
+
+# Geração de PDF em pool de processos: workers, jobs simultâneos na fila
+# (acima disso a API responde 429) e tempo que um PDF pronto fica
+# disponível para download.
+PDF_WORKERS = env_int("PDF_WORKERS", 2)
+PDF_MAX_PENDING = env_int("PDF_MAX_PENDING", 32)
+PDF_JOB_TTL_SECONDS = env_int("PDF_JOB_TTL_SECONDS", 600)
+PDF_JOB_TIMEOUT_SECONDS = env_int("PDF_JOB_TIMEOUT_SECONDS", 120)
+
+# Imagens do relatório: reduzidas para (tamanho exibido x ASSETS_DOWNSCALE)
+# pixels; 0 mantém os arquivos originais. Mudanças nos arquivos são
+# detectadas a cada ASSETS_RELOAD_INTERVAL_SECONDS.
+ASSETS_DOWNSCALE = float(os.getenv("ASSETS_DOWNSCALE") or 2)
+ASSETS_RELOAD_INTERVAL_SECONDS = env_int("ASSETS_RELOAD_INTERVAL_SECONDS", 5)
+
+# Templates do relatório (Jinja2): pasta do cache de bytecode (padrão: temp
+# do sistema) e se mudanças nos arquivos são recarregadas.
+TEMPLATES_CACHE_DIR = os.getenv("TEMPLATES_CACHE_DIR") or None
+TEMPLATES_AUTO_RELOAD = env_bool("TEMPLATES_AUTO_RELOAD", True)
+
+# Certificados do evento em lote: processos usados na conversão (padrão:
+# todos os cores).
+CERTIFICATE_WORKERS = env_int("CERTIFICATE_WORKERS", os.cpu_count() or 2)
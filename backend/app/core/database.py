@@ -1,8 +1,12 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 import os
 
+from app.core.db_pool import engine_options, instrument_pool, prometheus_lines
+from app.core.metrics import instrument_engine, registry
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -16,12 +20,11 @@ if DATABASE_URL.startswith("postgres://"):
         "postgres://", "postgresql+psycopg2://", 1
     )
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
-)
+# Pool configurado por env (ver app/core/config.py e app/core/db_pool.py)
+engine = create_engine(DATABASE_URL, **engine_options(is_async=False))
+instrument_pool("sync", engine.pool)
+instrument_engine("sync", engine)
+registry.add_collector(prometheus_lines)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -38,3 +41,41 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async (asyncpg) para os handlers mais acessados. Scripts e Alembic
+# continuam no engine síncrono acima.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or (
+    DATABASE_URL.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    .replace("postgresql://", "postgresql+asyncpg://", 1)
+)
+
+_async_engine = None
+
+
+def get_async_engine():
+    # criado sob demanda: quem só usa o engine síncrono não precisa do asyncpg
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            ASYNC_DATABASE_URL, **engine_options(is_async=True)
+        )
+        instrument_pool("async", _async_engine.sync_engine.pool)
+        instrument_engine("async", _async_engine.sync_engine)
+    return _async_engine
+
+
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db():
+    """
+    AsyncSession por requisição. Serviços síncronos rodam sobre ela com
+    `await db.run_sync(lambda session: Service.metodo(session, ...))`.
+    """
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
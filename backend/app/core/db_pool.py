@@ -0,0 +1,216 @@
+import bisect
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core import config
+
+
+# Limites (ms) dos buckets do histograma de espera por conexão
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """
+    Contadores de um pool de conexões: espera por checkout (histograma),
+    conexões em uso, timeouts, conexões abertas e invalidadas.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[Pool] = None
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.checkout_ms_sum = 0.0
+        self.checkout_ms_max = 0.0
+        self.checkout_buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_ms_sum += elapsed_ms
+            self.checkout_ms_max = max(self.checkout_ms_max, elapsed_ms)
+            self.checkout_buckets[bisect.bisect_left(CHECKOUT_BUCKETS_MS, elapsed_ms)] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            data = {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "in_use": self.in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "checkout_ms": {
+                    "avg": self.checkout_ms_sum / self.checkouts if self.checkouts else 0.0,
+                    "max": self.checkout_ms_max,
+                    "sum": self.checkout_ms_sum,
+                    # acumulado, como nos histogramas do Prometheus
+                    "buckets": {
+                        **{
+                            str(limit): sum(self.checkout_buckets[: i + 1])
+                            for i, limit in enumerate(CHECKOUT_BUCKETS_MS)
+                        },
+                        "+Inf": self.checkouts,
+                    },
+                },
+            }
+
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+            )
+        return data
+
+
+class _MeteredPoolMixin:
+    """Mede a espera em `_do_get` (fila do pool + abertura de conexão nova)."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout((time.perf_counter() - t0) * 1000)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() troca o pool por um novo da mesma classe
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncAdaptedQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class MeteredNullPool(_MeteredPoolMixin, NullPool):
+    pass
+
+
+# Métricas por engine ("sync", "async"), expostas em /metrics/db-pool
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def engine_options(is_async: bool) -> dict:
+    """Argumentos de create_engine / create_async_engine a partir do config."""
+    options = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+    connect_args = {}
+
+    if config.DB_PGBOUNCER:
+        options["poolclass"] = MeteredNullPool
+        if is_async:
+            # transaction pooling não mantém prepared statements entre transações
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    else:
+        options.update(
+            poolclass=MeteredAsyncAdaptedQueuePool if is_async else MeteredQueuePool,
+            pool_size=config.ASYNC_DB_POOL_SIZE if is_async else config.DB_POOL_SIZE,
+            max_overflow=config.ASYNC_DB_MAX_OVERFLOW if is_async else config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+        )
+        if config.DB_STATEMENT_TIMEOUT_MS:
+            if is_async:
+                connect_args["server_settings"] = {
+                    "statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS)
+                }
+            else:
+                connect_args["options"] = f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def prometheus_lines() -> list[str]:
+    """Estado dos pools no formato do Prometheus (coletor do /metrics)."""
+    snapshots = {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+    lines = []
+
+    for key, kind, help in (
+        ("in_use", "gauge", "Conexões em uso"),
+        ("size", "gauge", "Tamanho do pool"),
+        ("checked_in", "gauge", "Conexões livres no pool"),
+        ("overflow", "gauge", "Conexões em overflow"),
+        ("timeouts", "counter", "Timeouts esperando conexão"),
+        ("connects", "counter", "Conexões abertas"),
+        ("invalidations", "counter", "Conexões invalidadas"),
+    ):
+        name = f"bt_db_pool_{key}"
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        lines += [
+            f'{name}{{engine="{engine}"}} {data[key]}'
+            for engine, data in snapshots.items()
+            if key in data
+        ]
+
+    name = "bt_db_pool_checkout_duration_seconds"
+    lines += [f"# HELP {name} Espera por uma conexão do pool", f"# TYPE {name} histogram"]
+    for engine, data in snapshots.items():
+        checkout = data["checkout_ms"]
+        for limit, count in checkout["buckets"].items():
+            le = limit if limit == "+Inf" else repr(int(limit) / 1000)
+            lines.append(f'{name}_bucket{{engine="{engine}",le="{le}"}} {count}')
+        lines.append(f'{name}_sum{{engine="{engine}"}} {checkout["sum"] / 1000!r}')
+        lines.append(f'{name}_count{{engine="{engine}"}} {data["checkouts"]}')
+
+    return lines
+
+
+def instrument_pool(name: str, pool: Pool) -> PoolMetrics:
+    metrics = PoolMetrics(name)
+    metrics.pool = pool
+    pool.metrics = metrics
+    pool_metrics[name] = metrics
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with metrics._lock:
+            metrics.in_use += 1
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.in_use -= 1
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        with metrics._lock:
+            metrics.invalidations += 1
+
+    return metrics
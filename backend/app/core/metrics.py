@@ -0,0 +1,287 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import event
+
+from app.core import config
+
+
+# Buckets (segundos) usados por padrão nos histogramas
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Queries por requisição: deixa N+1 visível
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limit in enumerate(self.buckets):
+                if value <= limit:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._values.items()]
+
+        lines = self._header()
+        for labels, counts, total, count in items:
+            for limit, bucket_count in zip(self.buckets + (float("inf"),), counts + [count]):
+                le = f'le="{_format_number(limit)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {bucket_count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Métricas do processo no formato texto do Prometheus. Além das métricas
+    registradas, `collectors` geram linhas na hora (ex.: estado dos pools).
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], list[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_in_flight = registry.gauge(
+    "bt_http_requests_in_flight", "Requisições HTTP em andamento"
+)
+http_request_seconds = registry.histogram(
+    "bt_http_request_duration_seconds", "Latência das requisições HTTP", ("method", "route", "status")
+)
+http_request_queries = registry.histogram(
+    "bt_http_request_queries", "Queries SQL por requisição", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+http_request_db_seconds = registry.histogram(
+    "bt_http_request_db_seconds", "Tempo no banco por requisição", ("method", "route")
+)
+db_query_seconds = registry.histogram(
+    "bt_db_query_duration_seconds", "Duração das queries SQL", ("engine",)
+)
+span_seconds = registry.histogram(
+    "bt_span_duration_seconds", "Duração de trechos instrumentados (serviços, renderização)", ("span",)
+)
+
+
+# ---------- queries por requisição ----------
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    db_ms: float = 0.0
+
+
+# Definido pelo middleware no início de cada requisição. O objeto é
+# mutável, então as queries feitas no threadpool (handlers def) ou via
+# run_sync (greenlet) somam no mesmo contador.
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _query_stats.get()
+
+
+def instrument_engine(name: str, engine) -> None:
+    """Hooks before/after_cursor_execute: duração de cada query e soma na requisição."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_query_seconds.observe(elapsed, name)
+
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_ms += elapsed * 1000
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # a query falhou: after_cursor_execute não é chamado
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+
+# ---------- spans ----------
+
+@contextmanager
+def span(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        span_seconds.observe(time.perf_counter() - t0, name)
+
+
+def timed(name: str):
+    """Decorator: registra a duração da função em bt_span_duration_seconds{span=name}."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ---------- middleware ----------
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    # path_format: "/api/v1/events/{event_id}/status", sem os ids
+    return getattr(route, "path_format", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: latência por rota, requisições em andamento e
+    queries / tempo de banco por requisição. Com METRICS_DEBUG_HEADER
+    a resposta traz `X-Query-Stats: queries: N, db_ms: X`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _query_stats.set(stats)
+        status = 500
+
+        async def send_with_stats(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if config.METRICS_DEBUG_HEADER:
+                    header = f"queries: {stats.queries}, db_ms: {stats.db_ms:.1f}"
+                    message = {
+                        **message,
+                        "headers": [*message.get("headers", []), (b"x-query-stats", header.encode())],
+                    }
+            await send(message)
+
+        http_requests_in_flight.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            elapsed = time.perf_counter() - t0
+            http_requests_in_flight.dec()
+            _query_stats.reset(token)
+
+            method = scope["method"]
+            route = _route_label(scope)
+            http_request_seconds.observe(elapsed, method, route, str(status))
+            http_request_queries.observe(stats.queries, method, route)
+            http_request_db_seconds.observe(stats.db_ms / 1000, method, route)
@@ -1,12 +1,164 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import bcrypt
 
+from app.core import config
+
+
 # Hash da senha
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     password_bytes = password.encode("utf-8")[:72]  # garante <=72 bytes
-    hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
+    hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds or config.BCRYPT_ROUNDS))
     return hashed.decode()  # armazenar como string
 
 # Verificar senha
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     plain_bytes = plain_password.encode("utf-8")[:72]
     return bcrypt.checkpw(plain_bytes, hashed_password.encode())
+
+# Hash gerado com custo diferente do configurado (refazer no próximo login)
+def needs_rehash(hashed_password: str) -> bool:
+    try:
+        return int(hashed_password.split("$")[2]) != config.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+class PasswordCheckBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """
+    bcrypt fora do event loop e do threadpool das requisições: um executor
+    pequeno só para senhas, com limite de verificações em andamento (acima
+    dele, PasswordCheckBusy). Logins bem-sucedidos ficam em cache por
+    alguns minutos, então repetir o login não roda bcrypt de novo.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, cache_ttl_seconds: int, cache_max_entries: int = 1024):
+        self.max_pending = max_pending
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_max_entries = cache_max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._verified = OrderedDict()  # digest -> expira em
+        # chave do processo: o cache não guarda nada que sirva para testar senhas offline
+        self._cache_key = secrets.token_bytes(32)
+
+    def _digest(self, name: str, password: str, hashed: str) -> bytes:
+        # o hash armazenado entra na chave: troca de senha ou rehash invalida o cache
+        message = "\0".join((name, password, hashed)).encode("utf-8")
+        return hmac.new(self._cache_key, message, hashlib.sha256).digest()
+
+    def _cached(self, digest: bytes) -> bool:
+        with self._lock:
+            expires_at = self._verified.get(digest)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del self._verified[digest]
+                return False
+            return True
+
+    def _remember(self, digest: bytes) -> None:
+        with self._lock:
+            self._verified[digest] = time.monotonic() + self.cache_ttl_seconds
+            self._verified.move_to_end(digest)
+            while len(self._verified) > self.cache_max_entries:
+                self._verified.popitem(last=False)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordCheckBusy()
+            self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def verify(self, name: str, password: str, hashed: str) -> bool:
+        digest = self._digest(name, password, hashed)
+        if self.cache_ttl_seconds and self._cached(digest):
+            return True
+
+        ok = await self._run(verify_password, password, hashed)
+        if ok and self.cache_ttl_seconds:
+            self._remember(digest)
+        return ok
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+
+class LoginThrottle:
+    """
+    Tentativas de login com falha por nome e por IP numa janela deslizante.
+    Acima do limite, `retry_after` devolve quantos segundos esperar.
+    """
+
+    def __init__(self, max_per_name: int, max_per_ip: int, window_seconds: int, max_keys: int = 10000):
+        self.max_per_name = max_per_name
+        self.max_per_ip = max_per_ip
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._failures = OrderedDict()  # ("name" | "ip", valor) -> deque de instantes
+
+    def _recent(self, key, now: float) -> deque:
+        attempts = self._failures.get(key)
+        if attempts is None:
+            return deque()
+        while attempts and attempts[0] <= now - self.window_seconds:
+            attempts.popleft()
+        if not attempts:
+            del self._failures[key]
+        return attempts
+
+    def retry_after(self, name: str, ip: str) -> int:
+        now = time.monotonic()
+        wait = 0
+        with self._lock:
+            for key, limit in ((("name", name), self.max_per_name), (("ip", ip), self.max_per_ip)):
+                attempts = self._recent(key, now)
+                if len(attempts) >= limit:
+                    wait = max(wait, int(attempts[0] + self.window_seconds - now) + 1)
+        return wait
+
+    def failure(self, name: str, ip: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key in (("name", name), ("ip", ip)):
+                attempts = self._failures.setdefault(key, deque())
+                attempts.append(now)
+                self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    def success(self, name: str) -> None:
+        with self._lock:
+            self._failures.pop(("name", name), None)
+
+
+password_hasher = PasswordHasher(
+    max_workers=config.AUTH_WORKERS,
+    max_pending=config.AUTH_MAX_PENDING,
+    cache_ttl_seconds=config.AUTH_CACHE_TTL_SECONDS,
+)
+
+login_throttle = LoginThrottle(
+    max_per_name=config.LOGIN_MAX_ATTEMPTS_PER_NAME,
+    max_per_ip=config.LOGIN_MAX_ATTEMPTS_PER_IP,
+    window_seconds=config.LOGIN_ATTEMPT_WINDOW_SECONDS,
+)
@@ -0,0 +1,48 @@
+import threading
+import uuid
+
+
+# Identifica o processo: versões zeram a cada restart, então o ETag
+# precisa mudar junto para não validar uma resposta antiga.
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class VersionCounter:
+    """
+    Contador de versão monotônico por chave (em memória, por worker).
+    `generation` sobe a cada bump de qualquer chave: serve para saber se
+    algo mudou enquanto uma query rodava, antes de saber de qual chave.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._generation = 0
+
+    def get(self, key) -> int:
+        return self._versions.get(str(key), 0)
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump(self, key) -> int:
+        key = str(key)
+        with self._lock:
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            self._generation += 1
+        return version
+
+    def etag(self, key, version: int) -> str:
+        return f'"{BOOT_ID}-{key}-{version}"'
+
+
+# Estado do evento visto pelos participantes (evento aberto, rounds abertos)
+event_versions = VersionCounter()
+
+# Scores / totais do evento (ranking, resultados)
+score_versions = VersionCounter()
+
+# Gabaritos gravados no evento (lista de rounds: has_answer_key). Separado
+# de score_versions, que sobe a cada avaliação pontuada.
+answer_key_versions = VersionCounter()
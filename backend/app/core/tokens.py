@@ -0,0 +1,150 @@
+import base64
+import hashlib
+import hmac
+import secrets
+import struct
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core import config
+from app.enums.user_role import UserRole
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    participant_id: uuid.UUID
+    event_id: Optional[uuid.UUID]
+    role: UserRole
+    issued_at: int
+    expires_at: int
+
+
+# versão, participante, evento (zeros = sem evento), papel, emissão, expiração
+_PAYLOAD = struct.Struct(">B16s16sBII")
+_VERSION = 1
+_SIGNATURE_BYTES = 16
+_ROLES = list(UserRole)
+
+if config.TOKEN_SECRET:
+    _secret = config.TOKEN_SECRET.encode()
+else:
+    # sem TOKEN_SECRET (só em DEV_MODE, ver check_token_secret) os tokens
+    # valem só para este processo e somem no restart
+    _secret = secrets.token_bytes(32)
+
+
+def check_token_secret() -> None:
+    # chamado no startup da API (e não no import, que roda também nos workers)
+    if config.TOKEN_SECRET:
+        return
+    if not config.DEV_MODE:
+        raise RuntimeError("TOKEN_SECRET não definida (defina DEV_MODE=1 para desenvolvimento)")
+    print("[TOKENS] TOKEN_SECRET não definido: usando chave aleatória deste processo")
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(_secret, payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def issue_token(participant_id, event_id, role: UserRole, ttl_seconds: Optional[int] = None) -> str:
+    """Token compacto (~80 caracteres) assinado com HMAC-SHA256."""
+    now = int(time.time())
+    payload = _PAYLOAD.pack(
+        _VERSION,
+        uuid.UUID(str(participant_id)).bytes,
+        uuid.UUID(str(event_id)).bytes if event_id else bytes(16),
+        _ROLES.index(role or UserRole.PARTICIPANT),
+        now,
+        now + (ttl_seconds or config.TOKEN_TTL_SECONDS),
+    )
+    return _b64encode(payload + _sign(payload))
+
+
+def verify_token(token: str) -> TokenClaims:
+    """Valida assinatura, expiração e revogação sem acessar o banco."""
+    try:
+        raw = _b64decode(token)
+    except (ValueError, TypeError):
+        raise InvalidToken("Token malformado")
+
+    if len(raw) != _PAYLOAD.size + _SIGNATURE_BYTES:
+        raise InvalidToken("Token malformado")
+
+    payload, signature = raw[: _PAYLOAD.size], raw[_PAYLOAD.size :]
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidToken("Assinatura inválida")
+
+    version, participant_id, event_id, role, issued_at, expires_at = _PAYLOAD.unpack(payload)
+    if version != _VERSION or role >= len(_ROLES):
+        raise InvalidToken("Token malformado")
+    if expires_at <= time.time():
+        raise InvalidToken("Token expirado")
+
+    claims = TokenClaims(
+        participant_id=uuid.UUID(bytes=participant_id),
+        event_id=uuid.UUID(bytes=event_id) if any(event_id) else None,
+        role=_ROLES[role],
+        issued_at=issued_at,
+        expires_at=expires_at,
+    )
+    if revocations.is_revoked(claims):
+        raise InvalidToken("Token revogado")
+    return claims
+
+
+class RevocationList:
+    """
+    Participantes / eventos removidos (em memória, por worker). Tokens
+    emitidos até o momento da revogação deixam de valer; cada entrada
+    some depois de TOKEN_TTL_SECONDS, quando esses tokens já expiraram.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked = {}  # participant/event id -> revogado em (epoch)
+
+    def revoke(self, key) -> None:
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            self._revoked[str(key)] = now
+
+    def _purge(self, now: float) -> None:
+        limit = now - config.TOKEN_TTL_SECONDS
+        for key in [k for k, revoked_at in self._revoked.items() if revoked_at < limit]:
+            del self._revoked[key]
+
+    def is_revoked(self, claims: TokenClaims) -> bool:
+        if not self._revoked:
+            return False
+        for key in (claims.participant_id, claims.event_id):
+            revoked_at = self._revoked.get(str(key)) if key else None
+            if revoked_at is not None and claims.issued_at <= revoked_at:
+                return True
+        return False
+
+
+revocations = RevocationList()
+
+
+def revoke_participant(participant_id) -> None:
+    revocations.revoke(participant_id)
+
+
+def revoke_event(event_id) -> None:
+    revocations.revoke(event_id)
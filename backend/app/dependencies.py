@@ -1,33 +1,107 @@
+from dataclasses import dataclass
 from fastapi import Header, HTTPException, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import Optional
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core import config
+from app.core.database import get_async_db, get_db
+from app.core.tokens import InvalidToken, verify_token
+from app.enums.user_role import UserRole
 from app.models.participant import Participant
 
 
-def get_current_participant(
-    x_participant_id: str = Header(..., alias="X-Participant-Id"),
-    db: Session = Depends(get_db)
-) -> Participant:
+@dataclass(frozen=True)
+class CurrentParticipant:
+    """Participante autenticado (dados do token, sem objeto do banco)."""
+
+    id: UUID
+    event_id: Optional[UUID]
+    role: UserRole
+
+
+def _from_bearer(authorization: Optional[str]) -> Optional[CurrentParticipant]:
+    if not authorization:
+        return None
+
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    try:
+        claims = verify_token(token.strip())
+    except InvalidToken:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return CurrentParticipant(
+        id=claims.participant_id, event_id=claims.event_id, role=claims.role
+    )
+
+
+def _legacy_participant_id(x_participant_id: Optional[str]) -> UUID:
+    if not config.AUTH_LEGACY_HEADER or not x_participant_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     try:
-        participant_id = UUID(x_participant_id)
+        return UUID(x_participant_id)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid participant id"
         )
 
-    participant = (
-        db.query(Participant)
-        .filter(Participant.id == participant_id)
-        .first()
-    )
 
+def _from_row(participant: Optional[Participant]) -> CurrentParticipant:
     if not participant:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Participant not found"
         )
 
-    return participant
+    return CurrentParticipant(
+        id=participant.id, event_id=participant.event_id, role=participant.role
+    )
+
+
+def get_current_participant(
+    authorization: Optional[str] = Header(None),
+    x_participant_id: Optional[str] = Header(None, alias="X-Participant-Id"),
+    db: Session = Depends(get_db)
+) -> CurrentParticipant:
+    """
+    `Authorization: Bearer <token>` é validado em memória. O header
+    X-Participant-Id (clientes antigos, AUTH_LEGACY_HEADER) consulta o banco.
+    """
+    current = _from_bearer(authorization)
+    if current:
+        return current
+
+    participant_id = _legacy_participant_id(x_participant_id)
+    return _from_row(db.get(Participant, participant_id))
+
+
+async def get_current_participant_async(
+    authorization: Optional[str] = Header(None),
+    x_participant_id: Optional[str] = Header(None, alias="X-Participant-Id"),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentParticipant:
+    # a AsyncSession só pega conexão do pool na primeira query (modo legado)
+    current = _from_bearer(authorization)
+    if current:
+        return current
+
+    participant_id = _legacy_participant_id(x_participant_id)
+    return _from_row(await db.get(Participant, participant_id))
@@ -1,9 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.v1.api import api_router
 from app.api.v1.endpoints import auth
+from app.core.cache import results_cache
 from app.core.database import Base, engine
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.tokens import check_token_secret
 from scripts.init_mvp import init_mvp
+from app.services.pdf_jobs import pdf_jobs
+from app.services.pdf_result_renderer import ResultPdfRenderer
 
 # IMPORTANTE: importar TODOS os models que viram tabela
 from app.models.event import Event
@@ -31,9 +37,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# por último: envolve também o CORS, mede a requisição inteira
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.on_event("startup")
 def startup_event():
+    check_token_secret()
     init_mvp()
+    # tier em disco do cache de resultados: sobras de processos encerrados
+    results_cache.remove_stale_dirs()
+    ResultPdfRenderer.preload_assets()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    pdf_jobs.shutdown()
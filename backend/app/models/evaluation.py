@@ -8,6 +8,7 @@ from sqlalchemy import (
     UniqueConstraint,
     DateTime,
     CheckConstraint,
+    Index,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -61,6 +62,8 @@ class Evaluation(Base):
     ## Common Fields
     is_answer_key = Column(Boolean, default=False, nullable=False)
     score = Column(Integer, default=0, nullable=False)
+    # gerada pelo cliente no envio em lote (reenvio da fila offline)
+    idempotency_key = Column(String(64), nullable=True)
 
     submitted_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -71,6 +74,7 @@ class Evaluation(Base):
 
     __table_args__ = (
         UniqueConstraint("participant_id", "round_id"),
+        Index("uq_evaluations_idempotency_key", "idempotency_key", unique=True),
         CheckConstraint("visual_intensity BETWEEN 1 AND 5", name="ck_visual_intensity"),
         CheckConstraint("aroma_intensity BETWEEN 1 AND 5", name="ck_aroma_intensity"),
         CheckConstraint("acidity BETWEEN 1 AND 5", name="ck_acidity"),
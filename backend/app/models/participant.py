@@ -1,19 +1,24 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Index, event
 from app.core.db_types import GUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.enums.user_role import UserRole
 
 from app.core.database import Base
+from app.core.tokens import revoke_participant
 
 class Participant(Base):
     __tablename__ = "participants"
+    __table_args__ = (
+        # um nome por evento (sommeliers, sem evento, ficam de fora: NULL)
+        Index("uq_participants_event_name", "event_id", "name", unique=True),
+    )
 
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     event_id = Column(GUID(), ForeignKey("events.id"), nullable=True)
 
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     role = Column(Enum(UserRole), default=UserRole.PARTICIPANT)
     password_hash = Column(String, nullable=True)
 
@@ -22,4 +27,10 @@ class Participant(Base):
     evaluations = relationship(
         "Evaluation",
         back_populates="participant"
-    )
\ No newline at end of file
+    )
+
+
+@event.listens_for(Participant, "after_delete")
+def _revoke_tokens(mapper, connection, target):
+    # tokens são validados sem banco: participante removido entra na revogação
+    revoke_participant(target.id)
@@ -27,6 +27,8 @@ class EventRankingResponse(BaseModel):
     participant_name: str
     participant_percentual: float
     total_score: int
+    badge: Optional[str] = None
+    badge_key: Optional[str] = None
 
     class Config:
         from_attributes = True
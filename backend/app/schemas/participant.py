@@ -10,3 +10,4 @@ class ParticipantJoinResponse(BaseModel):
     name: str
     event_id: UUID
     event_code: str
+    token: str
@@ -15,6 +15,7 @@ class RoundUpdateRequest(BaseModel):
     name: Optional[str] = None
     position: Optional[int] = None
     is_open: Optional[bool] = None
+    answer_released: Optional[bool] = None
 
 class RoundResponse(BaseModel):
     id: UUID
@@ -26,6 +27,7 @@ class RoundResponse(BaseModel):
     wine_grapes: Optional[list[str]] = None
     wine_country: Optional[str] = None
     wine_vintage: Optional[int] = None
+    has_answer_key: bool = False
 
     class Config:
         from_attributes = True
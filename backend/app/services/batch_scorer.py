@@ -0,0 +1,222 @@
+from typing import List, NamedTuple
+
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.state_version import event_versions
+from app.models.evaluation import Evaluation
+from app.models.round import Round
+from app.models.wine import Wine
+from app.services.score_service import ScoreService, SCORED_ATTRIBUTES
+from app.services.scoring_rubric import (
+    SCORING_RUBRIC,
+    EXACT,
+    BOTH_PRESENT,
+    DESCRIPTORS,
+    OPTIONAL,
+    GRAPE,
+    split_descriptors,
+)
+
+
+class BatchScores(NamedTuple):
+    evaluation_ids: List
+    participant_ids: List
+    round_ids: List
+    event_ids: List
+    current: np.ndarray  # score gravado hoje
+    scores: np.ndarray  # score recalculado
+
+
+def _encode(values) -> np.ndarray:
+    """Valores arbitrários (enums, inteiros) -> códigos int32; None vira -1."""
+    codes = {}
+    return np.fromiter(
+        (-1 if v is None else codes.setdefault(v, len(codes)) for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+
+
+def _encode_descriptors(values) -> np.ndarray:
+    """Listas "a, b, c" -> bitsets (uint8 empacotado) sobre o vocabulário observado."""
+    token_sets = [split_descriptors(v) for v in values]
+    vocabulary = {}
+    for tokens in token_sets:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+
+    dense = np.zeros((len(values), max(len(vocabulary), 1)), dtype=bool)
+    for row, tokens in enumerate(token_sets):
+        for token in tokens:
+            dense[row, vocabulary[token]] = True
+
+    return np.packbits(dense, axis=1)
+
+
+class BatchScorer:
+    """
+    Pontuação vetorizada de muitas avaliações de uma vez (analytics e
+    recálculo em massa). Produz os mesmos totais que
+    ScoreService.calculate_score com o Wine da rodada consultado.
+    """
+
+    @staticmethod
+    def score(db: Session, event_ids=None) -> BatchScores:
+        query = db.query(
+            Evaluation.id,
+            Evaluation.participant_id,
+            Evaluation.round_id,
+            Round.event_id,
+            Evaluation.is_answer_key,
+            Evaluation.score,
+            *[getattr(Evaluation, attr).label(attr) for attr in SCORED_ATTRIBUTES],
+        ).join(Round, Round.id == Evaluation.round_id)
+
+        if event_ids is not None:
+            query = query.filter(Round.event_id.in_(list(event_ids)))
+
+        rows = query.all()
+
+        round_ids = list({r.round_id for r in rows})
+        wines = {}
+        if round_ids:
+            wines = dict(
+                db.query(Wine.round_id, Wine.grapes)
+                .filter(Wine.round_id.in_(round_ids))
+                .all()
+            )
+
+        return BatchScorer.score_rows(rows, wines)
+
+    @staticmethod
+    def score_rows(rows, wines: dict) -> BatchScores:
+        """
+        Núcleo vetorizado. `rows` precisa expor id, participant_id, round_id,
+        event_id, is_answer_key, score e os atributos da rubrica; `wines`
+        mapeia round_id -> lista de uvas.
+        """
+        round_index = {}
+        row_round = np.fromiter(
+            (round_index.setdefault(r.round_id, len(round_index)) for r in rows),
+            dtype=np.int32,
+            count=len(rows),
+        )
+        is_key = np.fromiter((r.is_answer_key for r in rows), dtype=bool, count=len(rows))
+
+        # linha do gabarito de cada rodada (-1 = rodada sem gabarito)
+        answer_row = np.full(len(round_index), -1, dtype=np.int64)
+        for i in np.flatnonzero(is_key)[::-1]:
+            answer_row[row_round[i]] = i
+
+        participant = np.flatnonzero(~is_key & (answer_row[row_round] >= 0))
+        answer = answer_row[row_round[participant]]
+
+        hits = []
+        weights = []
+
+        for rule in SCORING_RUBRIC:
+            values = [getattr(r, rule.attribute) for r in rows]
+
+            if rule.kind == DESCRIPTORS:
+                bits = _encode_descriptors(values)
+                matches = bits[participant] & bits[answer]
+                any_match = matches.any(axis=1)
+                full_match = (matches == bits[answer]).all(axis=1)
+                hits += [any_match & full_match, any_match & ~full_match]
+                weights += [rule.weight.value, rule.partial_weight.value]
+                continue
+
+            if rule.kind == GRAPE:
+                grape_codes = {}
+                codes = np.fromiter(
+                    (
+                        -1 if v is None else grape_codes.setdefault(
+                            getattr(v, "value", v), len(grape_codes)
+                        )
+                        for v in values
+                    ),
+                    dtype=np.int32,
+                    count=len(values),
+                )
+                # membership[rodada, uva] = uva faz parte do Wine da rodada
+                membership = np.zeros((len(round_index), max(len(grape_codes), 1)), dtype=bool)
+                for round_id, r_idx in round_index.items():
+                    for grape in wines.get(round_id) or ():
+                        if grape in grape_codes:
+                            membership[r_idx, grape_codes[grape]] = True
+
+                p_codes = codes[participant]
+                hit = (p_codes >= 0) & membership[
+                    row_round[participant], np.maximum(p_codes, 0)
+                ]
+                hits.append(hit)
+                weights.append(rule.weight.value)
+                continue
+
+            codes = _encode(values)
+            equal = codes[participant] == codes[answer]
+            if rule.kind in (BOTH_PRESENT, OPTIONAL):
+                equal &= codes[participant] >= 0
+            elif rule.kind != EXACT:
+                raise ValueError(f"Tipo de regra não suportado: {rule.kind}")
+
+            hits.append(equal)
+            weights.append(rule.weight.value)
+
+        if hits:
+            scores = np.column_stack(hits).astype(np.int32) @ np.asarray(weights, dtype=np.int32)
+        else:
+            scores = np.zeros(len(participant), dtype=np.int32)
+
+        current = np.fromiter(
+            (rows[i].score or 0 for i in participant), dtype=np.int32, count=len(participant)
+        )
+
+        return BatchScores(
+            evaluation_ids=[rows[i].id for i in participant],
+            participant_ids=[rows[i].participant_id for i in participant],
+            round_ids=[rows[i].round_id for i in participant],
+            event_ids=[rows[i].event_id for i in participant],
+            current=current,
+            scores=scores,
+        )
+
+    @staticmethod
+    def rescore(db: Session, event_ids=None) -> int:
+        """
+        Recalcula e grava os scores dos eventos (todos, se event_ids=None):
+        um UPDATE executemany só com as avaliações alteradas, o score máximo
+        dos gabaritos e os totais de cada evento afetado.
+        """
+        result = BatchScorer.score(db, event_ids)
+
+        changed = [
+            {"id": result.evaluation_ids[i], "score": int(result.scores[i])}
+            for i in np.flatnonzero(result.scores != result.current)
+        ]
+        if changed:
+            db.execute(update(Evaluation), changed)
+
+        answer_keys = (
+            db.query(Evaluation)
+            .join(Round, Round.id == Evaluation.round_id)
+            .filter(Evaluation.is_answer_key.is_(True))
+        )
+        if event_ids is not None:
+            answer_keys = answer_keys.filter(Round.event_id.in_(list(event_ids)))
+        for answer_key in answer_keys.all():
+            answer_key.score = ScoreService.calculate_score_absolute(answer_key)
+        db.flush()
+
+        affected_events = set(event_ids) if event_ids is not None else set(result.event_ids)
+        for event_id in affected_events:
+            ScoreService.recalculate_event_totals(db, event_id)
+
+        db.commit()
+
+        for event_id in affected_events:
+            event_versions.bump(event_id)
+
+        return len(changed)
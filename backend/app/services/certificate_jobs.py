@@ -0,0 +1,180 @@
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.core import config
+from app.core.database import SessionLocal
+from app.services.pdf_generator import PdfGenerator, render_in_worker
+from app.services.pdf_result_renderer import STYLESHEET_PATH, ResultPdfRenderer
+from app.services.results_service import build_event_results
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _safe_filename(name: str) -> str:
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Za-z0-9]+", "-", ascii_name).strip("-") or "participante"
+
+
+@dataclass
+class CertificateJob:
+    id: str
+    event_id: str
+    status: str = QUEUED
+    total: int = 0
+    done: int = 0
+    error: Optional[str] = None
+    zip_path: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+
+class CertificateJobManager:
+    """
+    Certificados (PDF de resultado) de todos os participantes de um evento,
+    empacotados em um ZIP.
+
+    Uma thread por job carrega os resultados do evento em lote, monta o
+    HTML de cada participante e converte em um pool de processos próprio
+    (todos os cores por padrão). Os PDFs são gravados no ZIP em disco à
+    medida que ficam prontos, com no máximo 2 por worker em andamento, então
+    nem HTMLs nem PDFs se acumulam em memória.
+    """
+
+    def __init__(self, max_workers: int, ttl_seconds: int):
+        self.max_workers = max_workers
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._by_event = {}
+
+    def _purge(self) -> None:
+        limit = time.time() - self.ttl_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < limit:
+                del self._jobs[job_id]
+                if self._by_event.get(job.event_id) == job_id:
+                    del self._by_event[job.event_id]
+                if job.zip_path:
+                    try:
+                        os.remove(job.zip_path)
+                    except OSError:
+                        pass
+
+    def submit(self, event_id) -> CertificateJob:
+        event_id = str(event_id)
+
+        with self._lock:
+            self._purge()
+
+            # um lote por evento de cada vez
+            current = self._jobs.get(self._by_event.get(event_id))
+            if current is not None and current.finished_at is None:
+                return current
+
+            job = CertificateJob(id=uuid.uuid4().hex, event_id=event_id)
+            self._jobs[job.id] = job
+            self._by_event[event_id] = job.id
+
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        return job
+
+    def get(self, job_id: str, event_id) -> Optional[CertificateJob]:
+        job = self._jobs.get(job_id)
+        if job is None or job.event_id != str(event_id):
+            return None
+        return job
+
+    def _run(self, job: CertificateJob) -> None:
+        job.status = RUNNING
+
+        try:
+            db = SessionLocal()
+            try:
+                participants = build_event_results(db, job.event_id)
+            finally:
+                db.close()
+
+            job.total = len(participants)
+
+            fd, job.zip_path = tempfile.mkstemp(prefix=f"certificados-{job.event_id}-", suffix=".zip")
+            os.close(fd)
+
+            with zipfile.ZipFile(job.zip_path, "w", compression=zipfile.ZIP_STORED) as zf:
+                if participants:
+                    self._render_all(job, participants, zf)
+
+            job.status = DONE
+        except Exception as exc:
+            job.status = FAILED
+            job.error = str(exc)
+        finally:
+            job.finished_at = time.time()
+
+    def _render_all(self, job: CertificateJob, participants: list[dict], zf: zipfile.ZipFile) -> None:
+        workers = min(self.max_workers, len(participants))
+        pending = {}
+        names = set()
+
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            items = iter(participants)
+
+            def submit_next() -> bool:
+                item = next(items, None)
+                if item is None:
+                    return False
+
+                pe = item["participant_event"]
+                html = ResultPdfRenderer.render(
+                    participant_name=item["participant_name"],
+                    results=item["results"],
+                    score_total=pe.score_total,
+                    score_max_total=pe.score_max_total,
+                    percentual=pe.percentual,
+                    badge=pe.badge,
+                    inline_css=False,
+                )
+
+                filename = _safe_filename(item["participant_name"])
+                if filename in names:
+                    filename = f"{filename}-{str(item['participant_id'])[:8]}"
+                names.add(filename)
+
+                pending[executor.submit(render_in_worker, html, STYLESHEET_PATH)] = f"{filename}.pdf"
+                return True
+
+            # janela: 2 PDFs em andamento por worker
+            for _ in range(workers * 2):
+                if not submit_next():
+                    break
+
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    filename = pending.pop(future)
+                    pdf, stats = future.result()
+                    zf.writestr(filename, pdf)
+                    PdfGenerator.report(stats)
+                    job.done += 1
+                    submit_next()
+
+
+certificate_jobs = CertificateJobManager(
+    max_workers=config.CERTIFICATE_WORKERS,
+    ttl_seconds=config.PDF_JOB_TTL_SECONDS,
+)
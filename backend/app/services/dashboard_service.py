@@ -0,0 +1,144 @@
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.core.state_version import event_versions
+from app.models.evaluation import Evaluation
+from app.models.round import Round
+
+
+class DashboardService:
+    """
+    Painel do sommelier: por round, envios, gabarito e média/máximo dos
+    scores até agora.
+
+    Os números saem de uma query agregada por evento e ficam em memória;
+    cada avaliação enviada soma direto nos contadores (record_submission),
+    então um painel atualizando a cada segundo não vai ao banco. Mudança
+    nos rounds (event_versions), gabarito ou recálculo descartam o evento,
+    e a cada DASHBOARD_RESYNC_SECONDS a query roda de novo (envios
+    recebidos por outros workers).
+    """
+
+    _lock = threading.Lock()
+    _entries = {}  # event_id -> {"version", "built_at", "rounds": {round_id: stats}}
+    _round_events = {}  # round_id -> event_id
+    _submissions_seen = 0  # avança a cada envio: detecta envio durante o build
+
+    @staticmethod
+    def build(db: Session, event_id) -> dict:
+        participant_only = Evaluation.is_answer_key.is_(False)
+        rows = (
+            db.query(
+                Round.id,
+                Round.name,
+                Round.position,
+                Round.is_open,
+                Round.answer_released,
+                func.count(Evaluation.id).filter(participant_only).label("submissions"),
+                func.coalesce(func.bool_or(Evaluation.is_answer_key), False).label("has_answer_key"),
+                func.count(Evaluation.score).filter(participant_only).label("scored"),
+                func.coalesce(func.sum(Evaluation.score).filter(participant_only), 0).label("score_sum"),
+                func.max(Evaluation.score).filter(participant_only).label("score_max"),
+            )
+            .outerjoin(Evaluation, Evaluation.round_id == Round.id)
+            .filter(Round.event_id == event_id)
+            .group_by(Round.id)
+            .order_by(Round.position.asc())
+            .all()
+        )
+
+        return {
+            str(row.id): {
+                "round_id": row.id,
+                "name": row.name,
+                "position": row.position,
+                "is_open": row.is_open,
+                "answer_released": row.answer_released,
+                "submissions": row.submissions,
+                "has_answer_key": row.has_answer_key,
+                "scored": row.scored,
+                "score_sum": row.score_sum,
+                "score_max": row.score_max,
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    def _snapshot(rounds: dict) -> list[dict]:
+        return [
+            {
+                "round_id": stats["round_id"],
+                "name": stats["name"],
+                "position": stats["position"],
+                "is_open": stats["is_open"],
+                "answer_released": stats["answer_released"],
+                "submissions": stats["submissions"],
+                "has_answer_key": stats["has_answer_key"],
+                "average_score": round(stats["score_sum"] / stats["scored"], 2) if stats["scored"] else None,
+                "max_score": stats["score_max"],
+            }
+            for stats in rounds.values()
+        ]
+
+    @staticmethod
+    def get(db: Session, event_id) -> list[dict]:
+        key = str(event_id)
+        version = event_versions.get(event_id)
+
+        with DashboardService._lock:
+            entry = DashboardService._entries.get(key)
+            if (
+                entry is not None
+                and entry["version"] == version
+                and time.monotonic() - entry["built_at"] < config.DASHBOARD_RESYNC_SECONDS
+            ):
+                return DashboardService._snapshot(entry["rounds"])
+            seen = DashboardService._submissions_seen
+
+        rounds = DashboardService.build(db, event_id)
+
+        with DashboardService._lock:
+            # um envio durante a query pode ter ficado de fora (ou entrar
+            # duas vezes): responde com o que leu, sem guardar
+            if DashboardService._submissions_seen == seen:
+                DashboardService._entries[key] = {
+                    "version": version,
+                    "built_at": time.monotonic(),
+                    "rounds": rounds,
+                }
+                for round_id in rounds:
+                    DashboardService._round_events[round_id] = key
+
+        return DashboardService._snapshot(rounds)
+
+    @staticmethod
+    def record_submission(round_id, score: Optional[int]) -> None:
+        """Chamar após o commit de uma avaliação de participante."""
+        with DashboardService._lock:
+            DashboardService._submissions_seen += 1
+
+            event_id = DashboardService._round_events.get(str(round_id))
+            entry = DashboardService._entries.get(event_id) if event_id else None
+            stats = entry["rounds"].get(str(round_id)) if entry else None
+            if stats is None:
+                return
+
+            stats["submissions"] += 1
+            if score is not None:
+                stats["scored"] += 1
+                stats["score_sum"] += score
+                stats["score_max"] = score if stats["score_max"] is None else max(stats["score_max"], score)
+
+    @staticmethod
+    def invalidate_event(event_id) -> None:
+        """Gabarito gravado ou scores recalculados: os agregados do evento mudaram."""
+        with DashboardService._lock:
+            entry = DashboardService._entries.pop(str(event_id), None)
+            if entry is not None:
+                for round_id in entry["rounds"]:
+                    DashboardService._round_events.pop(round_id, None)
@@ -1,16 +1,64 @@
-from sqlalchemy.orm import Session
+import threading
+import time
+import uuid
+from typing import NamedTuple, Optional
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
-from app.models.round import Round
-from app.models.wine import Wine
+from sqlalchemy.orm import Session
 
+from app.core import config
+from app.core.state_version import answer_key_versions, event_versions
 from app.models.evaluation import Evaluation
-from app.services.score_service import ScoreService
+from app.models.participant import Participant
+from app.models.round import Round
+from app.models.wine import Wine
 from app.schemas.evaluation import EvaluationCreate
-from typing import Optional
+from app.services.dashboard_service import DashboardService
+from app.services.score_service import SCORED_ATTRIBUTES, ScoreService
+
+
+# Resultado de cada item do envio em lote
+CREATED = "created"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+
+# SQLSTATE do PostgreSQL
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def integrity_error(error: IntegrityError) -> Exception:
+    """
+    Mensagem para o cliente conforme a constraint violada. Só a unique
+    (participant_id, round_id) é duplicata de fato; o resto volta como veio.
+    """
+    code = getattr(error.orig, "pgcode", None)
+    if code == UNIQUE_VIOLATION:
+        return ValueError("Avaliação já existe para este participante nesta rodada.")
+    if code == FOREIGN_KEY_VIOLATION:
+        return ValueError("Participante ou rodada não encontrados.")
+    return error
+
+
+class RoundScoring(NamedTuple):
+    """O que o envio de uma avaliação precisa da rodada para pontuar."""
+
+    event_id: object
+    answer_key: Optional[object]  # linha com os atributos da rubrica, ou None
+    wine_grapes: Optional[list]
+
 
 class EvaluationService:
 
+    _lock = threading.Lock()
+    # round_id -> (RoundScoring, versão do evento, guardado em)
+    _round_scoring = {}
+    # sobe a cada gabarito gravado: leituras iniciadas antes não entram no cache
+    _generation = 0
+
     @staticmethod
     def get_answer_key(
         db: Session,
@@ -25,85 +73,331 @@ class EvaluationService:
             .first()
         )
 
+    @staticmethod
+    def get_event_id(db: Session, round_id):
+        return db.query(Round.event_id).filter(Round.id == round_id).scalar()
+
+    @staticmethod
+    def get_round_scoring(db: Session, round_id) -> Optional[RoundScoring]:
+        """
+        Evento, gabarito e uvas do Wine da rodada (None se a rodada não
+        existe), em cache por worker. A entrada cai quando um gabarito é
+        gravado (invalidate_round), quando o evento muda (event_versions)
+        e, para gabaritos gravados em outro worker, após
+        ANSWER_KEY_CACHE_TTL_SECONDS. O fechamento da rodada recalcula
+        todos os scores de qualquer forma.
+        """
+        key = str(round_id)
+        with EvaluationService._lock:
+            entry = EvaluationService._round_scoring.get(key)
+            generation = EvaluationService._generation
+
+        if entry is not None:
+            scoring, version, cached_at = entry
+            if (
+                event_versions.get(scoring.event_id) == version
+                and time.monotonic() - cached_at < config.ANSWER_KEY_CACHE_TTL_SECONDS
+            ):
+                return scoring
+
+        row = (
+            db.query(
+                Round.event_id,
+                Wine.grapes.label("wine_grapes"),
+                Evaluation.id.label("answer_key_id"),
+                *[getattr(Evaluation, attr).label(attr) for attr in SCORED_ATTRIBUTES],
+            )
+            .outerjoin(Wine, Wine.round_id == Round.id)
+            .outerjoin(
+                Evaluation,
+                and_(Evaluation.round_id == Round.id, Evaluation.is_answer_key.is_(True)),
+            )
+            .filter(Round.id == round_id)
+            .first()
+        )
+        if row is None:
+            return None
+
+        scoring = RoundScoring(
+            event_id=row.event_id,
+            answer_key=row if row.answer_key_id is not None else None,
+            wine_grapes=row.wine_grapes,
+        )
+        with EvaluationService._lock:
+            if EvaluationService._generation == generation:
+                EvaluationService._round_scoring[key] = (
+                    scoring, event_versions.get(row.event_id), time.monotonic()
+                )
+        return scoring
+
+    @staticmethod
+    def invalidate_round(round_id) -> None:
+        with EvaluationService._lock:
+            EvaluationService._generation += 1
+            EvaluationService._round_scoring.pop(str(round_id), None)
+
+    @staticmethod
+    def build_values(payload: EvaluationCreate, **overrides) -> dict:
+        values = {
+            attr: getattr(payload, attr)
+            for attr in (
+                "participant_id", "round_id", "is_answer_key",
+                "limpidity", "visualIntensity", "color_type", "color_tone",
+                "condition", "aromaIntensity", "aromas",
+                "sweetness", "tannin", "acidity", "consistence", "alcohol",
+                "persistence", "flavors", "quality", "grape", "country", "vintage",
+            )
+        }
+        values.update(overrides)
+        return values
+
     @staticmethod
     def create(
         db: Session,
         payload: EvaluationCreate
     ) -> Evaluation:
-        # Se for gabarito, pré-preencher dados do Wine
-        grape = payload.grape
-        country = payload.country
-        vintage = payload.vintage
-        
         if payload.is_answer_key:
-            wine = db.query(Wine).filter(Wine.round_id == payload.round_id).first()
-            if wine:
-                # Usar informações do Wine se disponíveis
-                if wine.grapes:
-                    # Se houver múltiplas uvas, usar a primeira (ou a que foi passada)
-                    if not grape:
-                        # Pegar o valor do enum correto
-                        from app.enums.grape import Grape
-                        # Tenta encontrar a primeira uva que existe no enum
-                        for grape_obj in Grape:
-                            if grape_obj.value in wine.grapes:
-                                grape = grape_obj
-                                break
-                if wine.country:
-                    country = wine.country
-                if wine.vintage:
-                    vintage = wine.vintage
-        
-        evaluation = Evaluation(
-            participant_id=payload.participant_id,
-            round_id=payload.round_id,
-            limpidity=payload.limpidity,
-            visualIntensity=payload.visualIntensity,
-            color_type=payload.color_type,
-            color_tone=payload.color_tone,
-            is_answer_key=payload.is_answer_key,
-            condition=payload.condition,
-            aromaIntensity=payload.aromaIntensity,
-            aromas=payload.aromas,
-            sweetness=payload.sweetness,
-            tannin=payload.tannin,
-            acidity=payload.acidity,
-            consistence=payload.consistence,
-            alcohol=payload.alcohol,
-            persistence=payload.persistence,
-            flavors=payload.flavors,
-            quality=payload.quality,
-            grape=grape,
-            country=country,
-            vintage=vintage
+            return EvaluationService.create_answer_key(db, payload)
+        return EvaluationService.submit(db, payload)
+
+    @staticmethod
+    def submit(db: Session, payload: EvaluationCreate) -> Evaluation:
+        """
+        Avaliação de participante em uma única transação: score calculado
+        antes do INSERT (gabarito e uvas do cache da rodada), duplicata
+        detectada pelo ON CONFLICT e totais do evento no mesmo commit.
+        """
+        scoring = EvaluationService.get_round_scoring(db, payload.round_id)
+        if scoring is None:
+            raise ValueError("Rodada não encontrada.")
+
+        values = EvaluationService.build_values(payload)
+        score = 0
+        if scoring.answer_key is not None:
+            score = ScoreService.calculate_score(
+                Evaluation(**values), scoring.answer_key, wine_grapes=scoring.wine_grapes
+            )
+
+        statement = (
+            pg_insert(Evaluation)
+            .values(id=uuid.uuid4(), score=score, **values)
+            .on_conflict_do_nothing(index_elements=["participant_id", "round_id"])
+            .returning(Evaluation)
         )
 
         try:
-            db.add(evaluation)
+            evaluation = db.scalars(statement).first()
+            if evaluation is None:
+                db.rollback()
+                raise ValueError(
+                    "Avaliação já existe para este participante nesta rodada."
+                )
+
+            # totais do evento ajustados pelo score, na mesma transação
+            scored = scoring.answer_key is not None and config.INCREMENTAL_EVENT_TOTALS
+            if scored:
+                ScoreService.apply_submission_score(
+                    db, evaluation.participant_id, scoring.event_id, score
+                )
+
+            # fora da sessão o commit não expira os atributos (sem refresh)
+            db.flush()
+            db.expunge(evaluation)
             db.commit()
-            db.refresh(evaluation)
 
-            # 👉 Se NÃO for gabarito, calcular score
-            if not evaluation.is_answer_key:
-                answer_key = EvaluationService.get_answer_key(
-                    db,
-                    evaluation.round_id
+        except IntegrityError as e:
+            db.rollback()
+            raise integrity_error(e)
+
+        if scored:
+            ScoreService.scores_changed(scoring.event_id)
+        DashboardService.record_submission(evaluation.round_id, evaluation.score)
+        return evaluation
+
+    @staticmethod
+    def submit_batch(db: Session, items: list) -> dict:
+        """
+        Envio em lote (fila offline do cliente). `items` é uma lista de
+        (índice, idempotency_key, EvaluationCreate) já validados.
+        Pontua tudo contra os gabaritos em cache, grava em um único
+        INSERT ... ON CONFLICT DO NOTHING e ajusta os totais no mesmo
+        commit. Retorna {índice: {status, evaluation_id, score, detail}}:
+        itens já gravados (mesma chave ou mesmo participante/rodada) são
+        DUPLICATE com o id existente.
+        """
+        results = {}
+        repeats = []  # (índice, índice do primeiro item igual no lote)
+        first_by_key, first_by_pair = {}, {}
+        candidates = []
+
+        participant_ids = {payload.participant_id for _, _, payload in items}
+        known_participants = {
+            row.id
+            for row in db.query(Participant.id).filter(Participant.id.in_(participant_ids))
+        } if participant_ids else set()
+
+        for index, key, payload in items:
+            pair = (payload.participant_id, payload.round_id)
+            if payload.is_answer_key:
+                results[index] = {"status": REJECTED, "detail": "Gabarito deve ser enviado individualmente."}
+                continue
+            if key in first_by_key and first_by_key[key][1] != pair:
+                results[index] = {"status": REJECTED, "detail": "Chave de idempotência repetida no lote."}
+                continue
+            if key in first_by_key or pair in first_by_pair:
+                repeats.append((index, first_by_pair[pair]))
+                continue
+            if payload.participant_id not in known_participants:
+                results[index] = {"status": REJECTED, "detail": "Participante não encontrado."}
+                continue
+
+            scoring = EvaluationService.get_round_scoring(db, payload.round_id)
+            if scoring is None:
+                results[index] = {"status": REJECTED, "detail": "Rodada não encontrada."}
+                continue
+
+            first_by_key[key] = (index, pair)
+            first_by_pair[pair] = index
+            values = EvaluationService.build_values(payload)
+            score = 0
+            if scoring.answer_key is not None:
+                score = ScoreService.calculate_score(
+                    Evaluation(**values), scoring.answer_key, wine_grapes=scoring.wine_grapes
                 )
+            candidates.append((index, key, scoring, dict(values, id=uuid.uuid4(), score=score, idempotency_key=key)))
 
-                if answer_key:
-                    evaluation.score = ScoreService.calculate_score(
-                        evaluation,
-                        answer_key,
-                        db=db,
-                        round_id=evaluation.round_id
+        try:
+            inserted = set()
+            if candidates:
+                inserted = set(
+                    db.scalars(
+                        pg_insert(Evaluation)
+                        .values([row for _, _, _, row in candidates])
+                        .on_conflict_do_nothing()
+                        .returning(Evaluation.id)
                     )
-                    db.commit()
-                    db.refresh(evaluation)
+                )
 
-            return evaluation
+            conflicts = [c for c in candidates if c[3]["id"] not in inserted]
+            by_key, by_pair = {}, {}
+            if conflicts:
+                for row in db.query(
+                    Evaluation.id,
+                    Evaluation.score,
+                    Evaluation.idempotency_key,
+                    Evaluation.participant_id,
+                    Evaluation.round_id,
+                ).filter(
+                    or_(
+                        Evaluation.idempotency_key.in_([key for _, key, _, _ in conflicts]),
+                        tuple_(Evaluation.participant_id, Evaluation.round_id).in_(
+                            [(row["participant_id"], row["round_id"]) for _, _, _, row in conflicts]
+                        ),
+                    )
+                ):
+                    by_key[row.idempotency_key] = row
+                    by_pair[(row.participant_id, row.round_id)] = row
+
+            # totais do evento: soma dos scores novos por participante
+            totals = {}
+            for index, key, scoring, row in candidates:
+                if row["id"] in inserted:
+                    results[index] = {"status": CREATED, "evaluation_id": row["id"], "score": row["score"]}
+                    if scoring.answer_key is not None:
+                        event_scores = totals.setdefault(scoring.event_id, {})
+                        event_scores[row["participant_id"]] = (
+                            event_scores.get(row["participant_id"], 0) + row["score"]
+                        )
+                    continue
+
+                pair = (row["participant_id"], row["round_id"])
+                existing = by_key.get(key) or by_pair.get(pair)
+                if existing is None or (existing.participant_id, existing.round_id) != pair:
+                    # chave usada em outra avaliação (ou removida no meio do envio)
+                    results[index] = {"status": REJECTED, "detail": "Chave de idempotência já usada em outra avaliação."}
+                else:
+                    results[index] = {"status": DUPLICATE, "evaluation_id": existing.id, "score": existing.score}
+
+            if config.INCREMENTAL_EVENT_TOTALS:
+                for event_id, scores in totals.items():
+                    ScoreService.apply_submission_scores(db, event_id, scores)
+
+            db.commit()
 
-        except IntegrityError:
+        except IntegrityError as e:
             db.rollback()
-            raise ValueError(
-                "Avaliação já existe para este participante nesta rodada."
+            if getattr(e.orig, "pgcode", None) != FOREIGN_KEY_VIOLATION:
+                raise
+            # participante ou rodada removidos durante o envio
+            raise ValueError("Participante ou rodada não encontrados.")
+
+        if config.INCREMENTAL_EVENT_TOTALS:
+            for event_id in totals:
+                ScoreService.scores_changed(event_id)
+        for index, _, _, row in candidates:
+            if results[index]["status"] == CREATED:
+                DashboardService.record_submission(row["round_id"], row["score"])
+
+        for index, first in repeats:
+            result = results[first]
+            results[index] = (
+                {"status": DUPLICATE, "evaluation_id": result["evaluation_id"], "score": result["score"]}
+                if result["status"] != REJECTED
+                else dict(result)
+            )
+        return results
+
+    @staticmethod
+    def create_answer_key(db: Session, payload: EvaluationCreate) -> Evaluation:
+        # Pré-preencher dados do Wine
+        grape = payload.grape
+        country = payload.country
+        vintage = payload.vintage
+
+        wine = db.query(Wine).filter(Wine.round_id == payload.round_id).first()
+        if wine:
+            # Usar informações do Wine se disponíveis
+            if wine.grapes:
+                # Se houver múltiplas uvas, usar a primeira (ou a que foi passada)
+                if not grape:
+                    # Pegar o valor do enum correto
+                    from app.enums.grape import Grape
+                    # Tenta encontrar a primeira uva que existe no enum
+                    for grape_obj in Grape:
+                        if grape_obj.value in wine.grapes:
+                            grape = grape_obj
+                            break
+            if wine.country:
+                country = wine.country
+            if wine.vintage:
+                vintage = wine.vintage
+
+        evaluation = Evaluation(
+            **EvaluationService.build_values(
+                payload, grape=grape, country=country, vintage=vintage
             )
+        )
+
+        try:
+            db.add(evaluation)
+            db.flush()
+            event_id = EvaluationService.get_event_id(db, evaluation.round_id)
+
+            # 👉 Gabarito: recalcula só a contribuição desta rodada
+            if config.INCREMENTAL_EVENT_TOTALS:
+                ScoreService.apply_answer_key(db, evaluation, event_id)
+
+            db.commit()
+            db.refresh(evaluation)
+
+        except IntegrityError as e:
+            db.rollback()
+            raise integrity_error(e)
+
+        # envios seguintes pontuam contra este gabarito
+        EvaluationService.invalidate_round(evaluation.round_id)
+        answer_key_versions.bump(event_id)
+        # resultados em cache comparam com o gabarito anterior
+        ScoreService.scores_changed(event_id)
+        DashboardService.invalidate_event(event_id)
+        return evaluation
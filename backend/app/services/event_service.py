@@ -1,71 +1,23 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from app.models.evaluation import Evaluation
 from sqlalchemy import desc
 from app.models.round import Round
-from app.models.participant import Participant
-from app.models.participant_event import ParticipantEvent
 from uuid import UUID
 from app.models.event import Event
+from app.core import broker
+from app.core.state_version import event_versions
+from app.services.leaderboard_service import LeaderboardService
 
 
 class EventService:
 
     @staticmethod
-    def get_event_ranking(db, event_id):
-        results = (
-            db.query(
-                Participant.id.label("participant_id"),
-                Participant.name.label("participant_name"),
-                ParticipantEvent.percentual.label("participant_percentual"),
-                func.sum(Evaluation.score).label("total_score"),
-            )
-            .join(Evaluation, Evaluation.participant_id == Participant.id)
-            .join(Round, Round.id == Evaluation.round_id)
-            .join(ParticipantEvent, ParticipantEvent.participant_id == Participant.id)
-            .filter(Round.event_id == event_id, Evaluation.is_answer_key.is_(False))
-            .group_by(Participant.id, Participant.name, ParticipantEvent.percentual)
-            .order_by(func.sum(Evaluation.score).desc())
-            .limit(3)
-            .all()
-        )
-
-        ranking = []
-
-        current_position = 0
-        last_score = None
-
-        for row in results:
-            participant_id, participant_name, participant_percentual, total_score = row
-
-            if last_score is None or total_score < last_score:
-                current_position += 1
-                last_score = total_score
-
-            ranking.append(
-                {
-                    "position": current_position,
-                    "participant_id": participant_id,
-                    "participant_name": participant_name,
-                    "participant_percentual": participant_percentual,
-                    "total_score": total_score,
-                }
-            )
-
-        return ranking
+    def get_event_ranking(db, event_id, limit=3, offset=0):
+        return LeaderboardService.page(db, event_id, limit=limit, offset=offset)
 
     @staticmethod
     def get_event_winners(db: Session, event_id: UUID):
-        ranking = EventService.get_event_ranking(db, event_id)
-
-        if not ranking:
-            return []
-
-        top_score = ranking[0]["total_score"]
-
-        winners = [item for item in ranking if item["total_score"] == top_score]
-
-        return winners
+        return LeaderboardService.winners(db, event_id)
 
     @staticmethod
     def close_event(db: Session, event_id: str):
@@ -89,6 +41,9 @@ class EventService:
         event.is_open = False
         db.commit()
 
+        version = event_versions.bump(event.id)
+        broker.publish(event.id, broker.EVENT_CLOSED, version=version)
+
         return event
     
     @staticmethod
@@ -0,0 +1,85 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import MISS, VersionedCache
+from app.core.state_version import score_versions
+from app.models.participant import Participant
+from app.models.participant_event import ParticipantEvent
+
+
+_leaderboards = VersionedCache(max_entries=64)
+
+
+class LeaderboardService:
+    """
+    Ranking completo do evento, materializado a partir de ParticipantEvent
+    (mantido por recalculate_event_totals e pelo modo incremental) e
+    servido de um cache em memória por (evento, versão dos scores).
+    """
+
+    @staticmethod
+    def build(db: Session, event_id) -> list[dict]:
+        rows = (
+            db.query(
+                ParticipantEvent.participant_id,
+                Participant.name,
+                ParticipantEvent.percentual,
+                ParticipantEvent.score_total,
+                ParticipantEvent.badge,
+                ParticipantEvent.badge_key,
+            )
+            .join(Participant, Participant.id == ParticipantEvent.participant_id)
+            .filter(ParticipantEvent.event_id == event_id)
+            .order_by(ParticipantEvent.score_total.desc(), Participant.name.asc())
+            .all()
+        )
+
+        leaderboard = []
+
+        # ranking denso: empates dividem a posição e a próxima é a seguinte
+        current_position = 0
+        last_score = None
+
+        for row in rows:
+            if last_score is None or row.score_total < last_score:
+                current_position += 1
+                last_score = row.score_total
+
+            leaderboard.append(
+                {
+                    "position": current_position,
+                    "participant_id": row.participant_id,
+                    "participant_name": row.name,
+                    "participant_percentual": row.percentual,
+                    "total_score": row.score_total,
+                    "badge": row.badge,
+                    "badge_key": row.badge_key,
+                }
+            )
+
+        return leaderboard
+
+    @staticmethod
+    def get(db: Session, event_id) -> list[dict]:
+        # versão lida ANTES da query: se mudar no meio, a próxima leitura reconstrói
+        version = score_versions.get(event_id)
+
+        leaderboard = _leaderboards.get(event_id, version)
+        if leaderboard is MISS:
+            leaderboard = LeaderboardService.build(db, event_id)
+            _leaderboards.set(event_id, version, leaderboard)
+
+        return leaderboard
+
+    @staticmethod
+    def page(db: Session, event_id, limit: Optional[int] = None, offset: int = 0) -> list[dict]:
+        leaderboard = LeaderboardService.get(db, event_id)
+        end = offset + limit if limit is not None else None
+        return leaderboard[offset:end]
+
+    @staticmethod
+    def winners(db: Session, event_id) -> list[dict]:
+        return [
+            item for item in LeaderboardService.get(db, event_id) if item["position"] == 1
+        ]
@@ -0,0 +1,88 @@
+import threading
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.core.state_version import event_versions
+from app.enums.user_role import UserRole
+from app.models.event import Event
+from app.models.participant import Participant
+
+
+class ParticipantService:
+    """
+    Entrada de participantes no evento. Pensado para o pico do QR code:
+    o evento vem de um cache por código de acesso e o participante é
+    criado (ou reencontrado) em um único INSERT ... ON CONFLICT.
+    """
+
+    _lock = threading.Lock()
+    # access_code -> (event_id, access_code, versão do evento, guardado em)
+    _events_by_code = {}
+
+    @staticmethod
+    def get_event_by_code(db: Session, access_code: str) -> Optional[tuple]:
+        """
+        (event_id, access_code) do evento. A entrada cai quando o evento
+        muda (update_event / delete_event sobem event_versions) e, entre
+        workers, após EVENT_CODE_CACHE_TTL_SECONDS.
+        """
+        with ParticipantService._lock:
+            entry = ParticipantService._events_by_code.get(access_code)
+
+        if entry is not None:
+            event_id, code, version, cached_at = entry
+            if (
+                event_versions.get(event_id) == version
+                and time.monotonic() - cached_at < config.EVENT_CODE_CACHE_TTL_SECONDS
+            ):
+                return event_id, code
+
+        # geração lida ANTES da query: se algum evento mudou no meio, a linha
+        # pode ser anterior à mudança e não entra no cache (a próxima leitura
+        # busca de novo); sem mudança, a versão atual é a da linha lida
+        generation = event_versions.generation()
+        row = db.query(Event.id, Event.access_code).filter(Event.access_code == access_code).first()
+        with ParticipantService._lock:
+            if row is None:
+                ParticipantService._events_by_code.pop(access_code, None)
+                return None
+            version = event_versions.get(row.id)
+            if event_versions.generation() == generation:
+                ParticipantService._events_by_code[access_code] = (
+                    row.id, row.access_code, version, time.monotonic()
+                )
+        return row.id, row.access_code
+
+    @staticmethod
+    def join(db: Session, event_id, name: str):
+        """
+        Id do participante `name` no evento, criando se não existir.
+        Uma ida ao banco: o INSERT ignora o conflito no índice único
+        (event_id, name) e o SELECT do mesmo statement devolve o existente.
+        """
+        inserted = (
+            pg_insert(Participant)
+            .values(id=uuid.uuid4(), event_id=event_id, name=name, role=UserRole.PARTICIPANT)
+            .on_conflict_do_nothing(index_elements=["event_id", "name"])
+            .returning(Participant.id, Participant.role, literal_column("true").label("created"))
+            .cte("inserted")
+        )
+        existing = select(Participant.id, Participant.role, literal_column("false")).filter(
+            Participant.event_id == event_id, Participant.name == name
+        )
+        statement = union_all(select(inserted.c.id, inserted.c.role, inserted.c.created), existing).limit(1)
+
+        row = db.execute(statement).first()
+        if row is None:
+            # outra transação inseriu o mesmo nome durante o statement:
+            # o snapshot dele não enxerga a linha, então lê de novo
+            row = db.execute(existing).first()
+
+        db.commit()
+        return row
@@ -1,8 +1,124 @@
-from weasyprint import HTML
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from app.core.metrics import registry
+
+
+@dataclass
+class PdfRenderStats:
+    parse_ms: float  # HTML (e CSS, na primeira vez) -> árvore
+    layout_ms: float  # layout e paginação
+    write_ms: float  # serialização do PDF
+    bytes: int
+    html_ms: Optional[float] = None  # montagem do HTML (banco + template), no processo da API
+    wait_ms: Optional[float] = None  # tempo na fila do pool
+
+
+def print_render_stats(stats: PdfRenderStats) -> None:
+    # opt-in (benchmarks, depuração): PdfGenerator.add_stats_hook(print_render_stats)
+    prefix = ""
+    if stats.html_ms is not None:
+        prefix += f"HTML: {stats.html_ms / 1000:.2f}s | "
+    if stats.wait_ms is not None:
+        prefix += f"fila: {stats.wait_ms / 1000:.2f}s | "
+    print(
+        f"[PDF] {prefix}parse: {stats.parse_ms / 1000:.2f}s | "
+        f"layout: {stats.layout_ms / 1000:.2f}s | write: {stats.write_ms / 1000:.2f}s | "
+        f"{stats.bytes / 1024:.0f}KB"
+    )
+
+
+pdf_stage_seconds = registry.histogram(
+    "bt_pdf_stage_duration_seconds", "Etapas da geração de PDF", ("stage",)
+)
+pdf_bytes = registry.counter("bt_pdf_bytes_total", "Bytes de PDF gerados")
+
+
+def record_render_stats(stats: PdfRenderStats) -> None:
+    for stage in ("html", "wait", "parse", "layout", "write"):
+        value = getattr(stats, f"{stage}_ms")
+        if value is not None:
+            pdf_stage_seconds.observe(value / 1000, stage)
+    pdf_bytes.inc(amount=stats.bytes)
 
 
 class PdfGenerator:
+    """
+    Conversão HTML -> PDF. A configuração de fontes e as folhas de estilo
+    já parseadas ficam em memória por processo (cada worker do pool tem as
+    suas) e são reaproveitadas em todas as renderizações.
+    """
+
+    _font_config = None
+    _stylesheets = {}
+
+    # chamados no processo da API com as estatísticas de cada PDF
+    stats_hooks: list[Callable[[PdfRenderStats], None]] = [record_render_stats]
+
+    @staticmethod
+    def _get_font_config() -> FontConfiguration:
+        if PdfGenerator._font_config is None:
+            PdfGenerator._font_config = FontConfiguration()
+        return PdfGenerator._font_config
 
     @staticmethod
-    def from_html(html: str) -> bytes:
-        return HTML(string=html).write_pdf()
+    def _get_stylesheet(path: str) -> CSS:
+        stylesheet = PdfGenerator._stylesheets.get(path)
+        if stylesheet is None:
+            stylesheet = CSS(filename=path, font_config=PdfGenerator._get_font_config())
+            PdfGenerator._stylesheets[path] = stylesheet
+        return stylesheet
+
+    @staticmethod
+    def render(html: str, stylesheet: Optional[str] = None) -> tuple[bytes, PdfRenderStats]:
+        """
+        `stylesheet`: caminho de um CSS aplicado ao documento, parseado uma
+        vez por processo (o HTML não precisa trazer o <style>).
+        """
+        t0 = time.perf_counter()
+        font_config = PdfGenerator._get_font_config()
+        stylesheets = [PdfGenerator._get_stylesheet(stylesheet)] if stylesheet else []
+        document_html = HTML(string=html)
+
+        t1 = time.perf_counter()
+        document = document_html.render(stylesheets=stylesheets, font_config=font_config)
+
+        t2 = time.perf_counter()
+        pdf = document.write_pdf()
+
+        t3 = time.perf_counter()
+
+        return pdf, PdfRenderStats(
+            parse_ms=(t1 - t0) * 1000,
+            layout_ms=(t2 - t1) * 1000,
+            write_ms=(t3 - t2) * 1000,
+            bytes=len(pdf),
+        )
+
+    @staticmethod
+    def from_html(html: str, stylesheet: Optional[str] = None) -> bytes:
+        pdf, _ = PdfGenerator.render(html, stylesheet)
+        return pdf
+
+    @staticmethod
+    def add_stats_hook(hook: Callable[[PdfRenderStats], None]) -> None:
+        PdfGenerator.stats_hooks.append(hook)
+
+    @staticmethod
+    def report(stats: PdfRenderStats) -> None:
+        for hook in PdfGenerator.stats_hooks:
+            hook(stats)
+
+
+def render_in_worker(html: str, stylesheet: Optional[str] = None):
+    """
+    Executa no processo do pool, que mantém fontes e CSS parseado entre
+    as renderizações. Retorna (pdf, PdfRenderStats). Fica neste módulo
+    para que o worker importe só o necessário para renderizar (nada de
+    caches ou serviços do processo da API).
+    """
+    return PdfGenerator.render(html, stylesheet)
@@ -0,0 +1,195 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from app.core import config
+from app.core.cache import MISS, results_cache
+from app.services.pdf_generator import PdfGenerator, PdfRenderStats, render_in_worker
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class PdfQueueFull(Exception):
+    """Fila de renderização cheia: o cliente deve tentar de novo mais tarde."""
+
+
+@dataclass
+class PdfJob:
+    id: str
+    participant_id: str
+    cache_key: Optional[tuple]
+    future: Future
+    worker_future: Optional[Future] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    stats: Optional[PdfRenderStats] = None
+
+    @property
+    def status(self) -> str:
+        if self.future.done():
+            return FAILED if self.future.exception() else DONE
+        if self.worker_future is not None and self.worker_future.running():
+            return RUNNING
+        return QUEUED
+
+    @property
+    def error(self) -> Optional[str]:
+        if self.future.done() and self.future.exception():
+            return str(self.future.exception())
+        return None
+
+    def result(self) -> bytes:
+        pdf, _ = self.future.result()
+        return pdf
+
+
+class PdfJobManager:
+    """
+    Renderização de PDFs em um pool de processos, fora do threadpool das
+    requisições. O HTML é montado no processo da API (precisa do banco);
+    só a conversão pelo WeasyPrint vai para os workers.
+
+    - no máximo `max_pending` jobs na fila/rodando (PdfQueueFull acima disso);
+    - um job ativo por participante: pedidos repetidos recebem o mesmo job;
+    - PDFs já no cache de resultados viram jobs concluídos na hora;
+    - jobs concluídos ficam disponíveis para download por `ttl_seconds`.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, ttl_seconds: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._executor = None
+        self._jobs = {}
+        self._by_participant = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: o processo da API tem threads e conexões abertas
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _purge(self) -> None:
+        limit = time.time() - self.ttl_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < limit:
+                del self._jobs[job_id]
+                if self._by_participant.get(job.participant_id) == job_id:
+                    del self._by_participant[job.participant_id]
+
+    def pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.finished_at is None)
+
+    def submit(
+        self,
+        participant_id,
+        cache_key,
+        build_html: Callable[[], str],
+        stylesheet: Optional[str] = None,
+    ) -> PdfJob:
+        participant_id = str(participant_id)
+
+        with self._lock:
+            self._purge()
+
+            current = self._jobs.get(self._by_participant.get(participant_id))
+            if current is not None and (
+                current.finished_at is None
+                or (current.status == DONE and cache_key is not None and current.cache_key == cache_key)
+            ):
+                return current
+
+            cached = results_cache.get(cache_key) if cache_key is not None else MISS
+            if cached is MISS and self.pending() >= self.max_pending:
+                raise PdfQueueFull("Fila de geração de PDF cheia.")
+
+            # reserva o lugar na fila antes de montar o HTML (fora do lock)
+            future = Future()
+            job = PdfJob(
+                id=uuid.uuid4().hex,
+                participant_id=participant_id,
+                cache_key=cache_key,
+                future=future,
+            )
+            self._jobs[job.id] = job
+            self._by_participant[participant_id] = job.id
+
+        if cached is not MISS:
+            self._finish(job, result=(cached, None))
+            return job
+
+        try:
+            t0 = time.perf_counter()
+            html = build_html()
+            html_ms = (time.perf_counter() - t0) * 1000
+            job.worker_future = self._get_executor().submit(render_in_worker, html, stylesheet)
+        except Exception as exc:
+            self._finish(job, exception=exc)
+            raise
+
+        job.worker_future.add_done_callback(lambda f: self._on_rendered(job, f, html_ms))
+        return job
+
+    def _on_rendered(self, job: PdfJob, worker_future: Future, html_ms: float) -> None:
+        exc = worker_future.exception()
+        if exc is not None:
+            # worker morreu (OOM, segfault nativo): o próximo job cria outro pool
+            if isinstance(exc, BrokenProcessPool):
+                self._executor = None
+            self._finish(job, exception=exc)
+            return
+
+        pdf, stats = worker_future.result()
+        if job.cache_key is not None:
+            results_cache.set(job.cache_key, pdf)
+        self._finish(job, result=(pdf, stats))
+
+        stats.html_ms = html_ms
+        stats.wait_ms = max(
+            0.0,
+            (job.finished_at - job.created_at) * 1000
+            - html_ms
+            - stats.parse_ms
+            - stats.layout_ms
+            - stats.write_ms,
+        )
+        PdfGenerator.report(stats)
+
+    def _finish(self, job: PdfJob, result=None, exception=None) -> None:
+        job.finished_at = time.time()
+        if exception is not None:
+            job.future.set_exception(exception)
+        else:
+            job.stats = result[1]
+            job.future.set_result(result)
+
+    def get(self, job_id: str, participant_id) -> Optional[PdfJob]:
+        job = self._jobs.get(job_id)
+        if job is None or job.participant_id != str(participant_id):
+            return None
+        return job
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pdf_jobs = PdfJobManager(
+    max_workers=config.PDF_WORKERS,
+    max_pending=config.PDF_MAX_PENDING,
+    ttl_seconds=config.PDF_JOB_TTL_SECONDS,
+)
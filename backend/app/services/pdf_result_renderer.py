@@ -1,14 +1,99 @@
-from datetime import datetime
-from typing import List
-from app.schemas.results import EvaluationResultResponse
-from app.enums.badge_category import BadgeCategory
-import base64
+import tempfile
+import threading
 from pathlib import Path
 
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+from app.core import config
+from app.enums.badge_category import BadgeCategory
+from app.core.assets import assets
+from app.core.metrics import timed
+
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+# Na geração de PDF o CSS vai como folha de estilo já parseada
+# (PdfGenerator), não dentro do HTML.
+STYLESHEET_PATH = str(TEMPLATES_DIR / "result_report.css")
+
+# Tamanho em que cada imagem aparece no relatório (px do CSS)
+LOGO_SIZE = {"height": 200}
+HEADER_BADGE_SIZE = {"height": 200}
+PROFILE_BADGE_SIZE = {"width": 100}
+
+
+def _bytecode_cache_dir() -> str:
+    # compartilhado com os workers do pool de PDF (compilam o mesmo template)
+    directory = Path(config.TEMPLATES_CACHE_DIR or tempfile.gettempdir()) / "bt-jinja-cache"
+    directory.mkdir(parents=True, exist_ok=True)
+    return str(directory)
+
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    bytecode_cache=FileSystemBytecodeCache(_bytecode_cache_dir()),
+    auto_reload=config.TEMPLATES_AUTO_RELOAD,
+)
+
+# Partes estáticas renderizadas uma vez: CSS e tabela de perfis (uma por
+# badge destacado, refeita se as imagens forem recarregadas).
+_static_lock = threading.Lock()
+_css = None
+_profiles_html = {}
+
 
 class ResultPdfRenderer:
 
     @staticmethod
+    def preload_assets():
+        """
+        Na inicialização: codifica logo e badges nos tamanhos usados e
+        compila os templates do relatório.
+        """
+        assets.preload(
+            [("logo_app.png", None, LOGO_SIZE["height"])]
+            + [
+                (f"{category.value['key']}.png", size.get("width"), size.get("height"))
+                for category in BadgeCategory
+                for size in (HEADER_BADGE_SIZE, PROFILE_BADGE_SIZE)
+            ]
+        )
+        _env.get_template("result_report.html")
+        _env.get_template("_profiles.html")
+
+    @staticmethod
+    def _get_css() -> Markup:
+        global _css
+        if _css is None:
+            with _static_lock:
+                _css = Markup((TEMPLATES_DIR / "result_report.css").read_text(encoding="utf-8"))
+        return _css
+
+    @staticmethod
+    def _get_profiles_html(badge: str) -> Markup:
+        key = (badge, assets.generation)
+        html = _profiles_html.get(key)
+        if html is None:
+            profiles = [
+                {
+                    "image": Markup(assets.base64(f"{category.value['key']}.png", **PROFILE_BADGE_SIZE)),
+                    "description": category.value["label"],
+                    "is_current": category.value["key"] == badge,
+                }
+                for category in BadgeCategory
+            ]
+            html = Markup(_env.get_template("_profiles.html").render(profiles=profiles))
+            with _static_lock:
+                # gerações antigas não servem mais
+                for old_key in [k for k in _profiles_html if k[1] != assets.generation]:
+                    del _profiles_html[old_key]
+                _profiles_html[key] = html
+        return html
+
+    @staticmethod
+    @timed("pdf.render_html")
     def render(
         participant_name: str,
         results: list[dict],
@@ -16,192 +101,24 @@ class ResultPdfRenderer:
         score_max_total:int,
         percentual: int,
         badge: str,
+        inline_css: bool = True,
     ) -> str:
-        BASE_DIR = Path(__file__).resolve().parent.parent
-        ASSETS_DIR = BASE_DIR / "assets"
-
-        logo_path = ASSETS_DIR / "logo_app.png"
-        badge_path = ASSETS_DIR / f"{badge.lower()}.png"
-
-        with open(logo_path, "rb") as f:
-            logo_base64 = base64.b64encode(f.read()).decode("utf-8")
-
-        with open(badge_path, "rb") as b:
-            badge_base64 = base64.b64encode(b.read()).decode("utf-8")
-
-        rounds_html = ""
-
-        for r in results:
-            blocks_html = ""
-            for block in r["blocks"]:
-                rows_html = ""
-                for item in block["items"]:
-                    rows_html += f"""
-                    <tr class="{item['status']}">
-                        <td>{item['label']}</td>
-                        <td>{item['participant']}</td>
-                        <td>{item['answer_key']}</td>
-                    </tr>
-                    """
-
-                blocks_html += f"""
-                <h3>{block['label']}</h3>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Item</th>
-                            <th>Participante</th>
-                            <th>Sommelier</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {rows_html}
-                    </tbody>
-                </table>
-                """
-
-            rounds_html += f"""
-            <section class="round">
-                <h2>{r['round_name']}</h2>
-                {blocks_html}
-            </section>
-            """
-
-        profiles_html = ""
-
-        for category in BadgeCategory:
-            key = category.value["key"]
-            description = category.value["label"]
-            is_current = key == badge
-
-            badge_img_path = BASE_DIR / "assets" / f"{key}.png"
-            with open(badge_img_path, "rb") as b:
-                badge_img_base64 = base64.b64encode(b.read()).decode("utf-8")
-
-            profiles_html += f"""
-            <tr class="profile-row {'current' if is_current else ''}">
-                <td class="profile-badge">
-                    <img src="data:image/png;base64,{badge_img_base64}" />
-                </td>
-                <td class="profile-description">
-                    {description}
-                </td>
-            </tr>
-
-            """
-
-        return f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .header {{
-                    display: flex;
-                    align-items: center;
-                    gap: 16px;
-                    margin-bottom: 20px;
-                    border-bottom: 2px solid #ddd;
-                    padding-bottom: 10px;
-                }}
-                .header-logo img {{
-                    height: 200px;
-                }}
-                .header-text h1 {{
-                    margin: 0;
-                    font-size: 22px;
-                    color: #333;
-                }}
-                .header-text h3 {{
-                    margin: 4px 0;
-                    font-size: 16px;
-                    color: #555;
-                }}
-                .header-text .total-score {{
-                    font-weight: bold;
-                    font-size: 18px;
-                    color: #555;
-                }}
-                h2 {{ margin-top: 30px; color: #1f2937; }}
-                h3 {{ margin-bottom: 8px; }}
-                table {{ width: 100%; border-collapse: collapse; margin-bottom: 20px; }}
-                th, td {{ border: 1px solid #ddd; padding: 6px; font-size: 12px; text-align: left; }}
-                tr.correct {{ background: #e8f5e9; }}
-                tr.partial {{ background: #fffde7; }}
-                tr.wrong {{ background: #ffebee; }}
-                .profiles {{
-                    margin-top: 40px;
-                }}
-
-                .profiles-table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                }}
-
-                .profiles-table td {{
-                    border: 0px solid #ddd;
-                    padding: 12px;
-                    vertical-align: middle;
-                    font-size: 13px;
-                }}
-
-                .profile-badge {{
-                    width: 100px;
-                    text-align: center;
-                }}
-
-                .profile-badge img {{
-                    width: 100px;
-                    height: auto;
-                }}
-
-                .profile-description {{
-                    line-height: 1.5;
-                    color: #333;
-                }}
-
-                .profile-row.current {{
-                    background: #eef6ff;
-                    border-left: 4px solid #2563eb;
-                }}
-                .texto {{
-                    display: block;
-                    text-align: center;
-                    }}
-
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <div class="header-logo">
-                    <img src="data:image/png;base64,{logo_base64}" alt="Logo">
-                </div>
-                <div class="header-text">
-                    <h1>{r['event_name']}</h1>
-                    <h3 class="total-score">Parabéns <strong>{participant_name}!</strong></h3>
-                    <h3 class="total-score">O seu score é {percentual}%.</h3>
-                    <h3 class="total-score">Você atingiu {score_total} de um total de {score_max_total} pontos.</h3>
-                    <h3 class="total-score">Seu perfil sensorial é {badge}</h3>
-                </div>
-                <div class="header-logo">
-                    <img src="data:image/png;base64,{badge_base64}" alt="badge">
-                </div>
-            </div>
-
-            {rounds_html}
-
-            <section class="profiles">
-                <h2>Perfis Sensoriais</h2>
-                <table class="profiles-table">
-                    <tbody>
-                        {profiles_html}
-                    </tbody>
-                </table>
-                <div>
-                    <span class="texto">O desenvolvimento do perfil sensorial vem com prática, <br />
-                      repertório e boas degustações guiadas. </span>
-                </div>
-            </section>
-
-        </body>
-        </html>
-        """
+        template = _env.get_template("result_report.html")
+
+        # generate() produz o documento em pedaços; um único join no final
+        return "".join(
+            template.generate(
+                css=ResultPdfRenderer._get_css() if inline_css else None,
+                # base64 não tem caracteres especiais de HTML: evita escapar ~200KB
+                logo=Markup(assets.base64("logo_app.png", **LOGO_SIZE)),
+                badge_image=Markup(assets.base64(f"{badge.lower()}.png", **HEADER_BADGE_SIZE)),
+                event_name=results[-1]["event_name"] if results else "Degustação às Cegas",
+                participant_name=participant_name,
+                percentual=percentual,
+                score_total=score_total,
+                score_max_total=score_max_total,
+                badge=badge,
+                results=results,
+                profiles_html=ResultPdfRenderer._get_profiles_html(badge),
+            )
+        )
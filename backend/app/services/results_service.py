@@ -2,10 +2,18 @@ from sqlalchemy.orm import Session
 from app.models.evaluation import Evaluation
 from app.models.round import Round
 from app.models.event import Event
+from app.models.wine import Wine
 from app.enums.scale_type import resolve_scale_label, ATTRIBUTE_SCALE
 from app.core.database import get_db
 from fastapi import HTTPException
 from app.models.participant_event import ParticipantEvent
+from app.models.participant import Participant
+from app.services.score_service import ScoreService
+from app.services.scoring_rubric import scorer
+from app.services.pdf_result_renderer import ResultPdfRenderer
+from app.core.cache import MISS, results_cache
+from app.core.state_version import score_versions
+from typing import Optional
 from uuid import UUID
 
 
@@ -125,54 +133,59 @@ def _format_value(attribute: str, value):
     return " ".join(word.capitalize() for word in formatted.split())
 
 
-def _build_item(attribute, label, participant_eval, answer_key_eval):
+def _build_item(attribute, label, participant_eval, answer_key_eval, status):
     """
-    Constrói o item de resultado, comparando participante vs gabarito.
-    Para aromas e sabores, permite status 'partial'.
+    Constrói o item de resultado a partir do status já calculado pela
+    rubrica de pontuação (correct / partial / wrong).
     """
 
     participant_value = getattr(participant_eval, attribute, None)
     answer_key_value = getattr(answer_key_eval, attribute, None)
 
-    # Converte o valor para label legível
-    participant_label = _format_value(attribute, participant_value)
-    answer_key_label = _format_value(attribute, answer_key_value)
-
-    # Tratamento especial para aromas e sabores (parcial)
-    if attribute in ["aromas", "flavors"]:
-        # transforma em sets de strings normalizadas
-        participant_set = (
-            set(a.strip().lower() for a in participant_value.split(","))
-            if participant_value
-            else set()
-        )
-        answer_key_set = (
-            set(a.strip().lower() for a in answer_key_value.split(","))
-            if answer_key_value
-            else set()
-        )
-
-        matches = participant_set & answer_key_set
-
-        if not matches:
-            status = "wrong"
-        elif matches == answer_key_set:
-            status = "correct"
-        else:
-            status = "partial"
-    else:
-        # Demais atributos: comparação direta
-        status = "correct" if participant_value == answer_key_value else "wrong"
-
     return {
         "key": attribute,
         "label": label,
-        "participant": participant_label,
-        "answer_key": answer_key_label,
+        "participant": _format_value(attribute, participant_value),
+        "answer_key": _format_value(attribute, answer_key_value),
         "status": status,
     }
 
 
+def _build_blocks(participant_eval, answer_key_eval, wine_grapes):
+    # Mesma passada da pontuação: total + status de cada atributo
+    statuses = scorer.score(participant_eval, answer_key_eval, wine_grapes).statuses
+
+    blocks = []
+
+    for block in BLOCKS:
+        items = []
+
+        for attribute, label in block["items"]:
+            # Regra: tanino não existe para vinho branco
+            if attribute == "tannin" and participant_eval.color_type == "branco":
+                continue
+
+            items.append(
+                _build_item(
+                    attribute,
+                    label,
+                    participant_eval,
+                    answer_key_eval,
+                    statuses[attribute],
+                )
+            )
+
+        blocks.append(
+            {
+                "key": block["key"],
+                "label": block["label"],
+                "items": items,
+            }
+        )
+
+    return blocks
+
+
 def build_participant_result(
     participant_id: UUID,
     round_id: UUID,
@@ -220,38 +233,13 @@ def build_participant_result(
         event_obj = db.query(Event).filter(Event.id == round_obj.event_id).first()
         event_name = event_obj.name if event_obj else f"Degustação às Cegas"
 
-        blocks = []
-
-        for block in BLOCKS:
-            items = []
-
-            for attribute, label in block["items"]:
-                # Regra: tanino não existe para vinho branco
-                if attribute == "tannin" and participant_eval.color_type == "branco":
-                    continue
-
-                items.append(
-                    _build_item(
-                        attribute,
-                        label,
-                        participant_eval,
-                        answer_key_eval,
-                    )
-                )
-
-            blocks.append(
-                {
-                    "key": block["key"],
-                    "label": block["label"],
-                    "items": items,
-                }
-            )
+        wine_grapes = ScoreService.get_wine_grapes(db, round_id)
 
         return {
             "round_id": round_id,
             "round_name": round_name,
             "event_name": event_name,
-            "blocks": blocks,
+            "blocks": _build_blocks(participant_eval, answer_key_eval, wine_grapes),
         }
 
     finally:
@@ -259,59 +247,270 @@ def build_participant_result(
             db.close()
 
 
-def get_my_results(
+def build_participant_event_results(
     db: Session,
     participant_id: UUID,
+    event_id: Optional[UUID] = None,
 ):
-    # Descobrir os rounds que o participante respondeu
-    rounds_with_position = (
-        db.query(Evaluation.round_id, Round.position)
+    """
+    Resultado de todas as rodadas respondidas pelo participante (do evento
+    informado, ou de todos), em ordem de posição. Número fixo de queries,
+    independente da quantidade de rodadas: avaliações + rodadas, gabaritos,
+    vinhos e eventos.
+    """
+    query = (
+        db.query(Evaluation, Round)
         .join(Round, Round.id == Evaluation.round_id)
         .filter(
             Evaluation.participant_id == participant_id,
             Evaluation.is_answer_key.is_(False),
         )
-        .distinct()
-        .order_by(Round.position.asc())
-        .all()
     )
-  
-    if not rounds_with_position:
+    if event_id is not None:
+        query = query.filter(Round.event_id == event_id)
+
+    participant_rows = query.order_by(Round.position.asc()).all()
+
+    if not participant_rows:
         raise HTTPException(
             status_code=404,
             detail="Nenhum resultado encontrado para este participante.",
         )
 
-    round_ids = [r.round_id for r in rounds_with_position]
+    answer_keys, wines, event_names = _load_round_context(
+        db, [round_obj for _, round_obj in participant_rows]
+    )
 
     results = []
 
-    for round_id in round_ids:
-        result = build_participant_result(
-            participant_id=participant_id,
-            round_id=round_id,
-            db=db,
+    for participant_eval, round_obj in participant_rows:
+        answer_key_eval = answer_keys.get(round_obj.id)
+
+        if not answer_key_eval:
+            raise HTTPException(
+                status_code=409,
+                detail="Resultado ainda não disponível para este round.",
+            )
+
+        results.append(
+            _build_round_result(
+                participant_eval, round_obj, answer_key_eval, wines, event_names
+            )
         )
-        results.append(result)
 
     return results
 
 
+def _load_round_context(db: Session, rounds):
+    """Gabaritos, uvas e nomes de evento das rodadas: 3 queries."""
+    round_ids = list({round_obj.id for round_obj in rounds})
+
+    answer_keys = {
+        answer_key.round_id: answer_key
+        for answer_key in db.query(Evaluation).filter(
+            Evaluation.round_id.in_(round_ids),
+            Evaluation.is_answer_key.is_(True),
+        )
+    }
+
+    wines = dict(
+        db.query(Wine.round_id, Wine.grapes).filter(Wine.round_id.in_(round_ids)).all()
+    )
+
+    event_names = dict(
+        db.query(Event.id, Event.name)
+        .filter(Event.id.in_({round_obj.event_id for round_obj in rounds}))
+        .all()
+    )
+
+    return answer_keys, wines, event_names
+
+
+def _build_round_result(participant_eval, round_obj, answer_key_eval, wines, event_names):
+    return {
+        "round_id": str(round_obj.id),
+        "round_name": round_obj.name,
+        "event_name": event_names.get(round_obj.event_id, "Degustação às Cegas"),
+        "blocks": _build_blocks(
+            participant_eval, answer_key_eval, wines.get(round_obj.id)
+        ),
+    }
+
+
+def build_event_results(db: Session, event_id: UUID) -> list[dict]:
+    """
+    Resultados de todos os participantes do evento (os que têm
+    ParticipantEvent), para a geração em lote dos certificados. Número fixo
+    de queries. Rodadas ainda sem gabarito ficam de fora em vez de falhar
+    o lote inteiro.
+    """
+    participants = (
+        db.query(ParticipantEvent, Participant.name)
+        .join(Participant, Participant.id == ParticipantEvent.participant_id)
+        .filter(ParticipantEvent.event_id == event_id)
+        .order_by(Participant.name.asc())
+        .all()
+    )
+    if not participants:
+        return []
+
+    rows = (
+        db.query(Evaluation, Round)
+        .join(Round, Round.id == Evaluation.round_id)
+        .filter(Round.event_id == event_id, Evaluation.is_answer_key.is_(False))
+        .order_by(Round.position.asc())
+        .all()
+    )
+
+    answer_keys, wines, event_names = (
+        _load_round_context(db, [round_obj for _, round_obj in rows]) if rows else ({}, {}, {})
+    )
+
+    results_by_participant = {}
+    for participant_eval, round_obj in rows:
+        answer_key_eval = answer_keys.get(round_obj.id)
+        if not answer_key_eval:
+            continue
+
+        results_by_participant.setdefault(participant_eval.participant_id, []).append(
+            _build_round_result(
+                participant_eval, round_obj, answer_key_eval, wines, event_names
+            )
+        )
+
+    return [
+        {
+            "participant_id": pe.participant_id,
+            "participant_name": name,
+            "participant_event": pe,
+            "results": results_by_participant.get(pe.participant_id, []),
+        }
+        for pe, name in participants
+    ]
+
+
+def get_my_results(
+    db: Session,
+    participant_id: UUID,
+):
+    return build_participant_event_results(db, participant_id)
+
+
+def results_cache_key(kind: str, participant_id, event_id, event_is_open, *extra):
+    """
+    Chave do cache de resultados. Só eventos fechados são cacheados
+    (retorna None se o evento está aberto); a versão dos scores entra na
+    chave, então um recálculo nunca devolve um documento antigo.
+    """
+    if event_is_open is not False:
+        return None
+
+    return (
+        kind,
+        str(participant_id),
+        str(event_id),
+        score_versions.get(event_id),
+        *(str(value) for value in extra),
+    )
+
+
+def cached_result(key, build):
+    if key is None:
+        return build()
+
+    value = results_cache.get(key)
+    if value is MISS:
+        value = build()
+        results_cache.set(key, value)
+
+    return value
+
+
+def get_cached_participant_result(db: Session, participant_id: UUID, round_id):
+    state = (
+        db.query(Round.event_id, Event.is_open)
+        .join(Event, Event.id == Round.event_id)
+        .filter(Round.id == round_id)
+        .first()
+    )
+    key = (
+        results_cache_key("round", participant_id, state.event_id, state.is_open, round_id)
+        if state
+        else None
+    )
+
+    return cached_result(
+        key,
+        lambda: build_participant_result(
+            participant_id=participant_id, round_id=round_id, db=db
+        ),
+    )
+
+
+def get_cached_event_results(db: Session, participant_id: UUID, event_id: Optional[UUID]):
+    is_open = (
+        db.query(Event.is_open).filter(Event.id == event_id).scalar()
+        if event_id is not None
+        else None
+    )
+
+    return cached_result(
+        results_cache_key("event", participant_id, event_id, is_open),
+        lambda: build_participant_event_results(db, participant_id, event_id),
+    )
+
+
+def build_result_report_html(
+    db: Session, participant_id: UUID, pe: ParticipantEvent, inline_css: bool = True
+) -> str:
+    """
+    HTML do relatório de resultados do participante. Para o PDF use
+    inline_css=False: o CSS entra como folha de estilo pré-parseada.
+    """
+    results = get_my_results(db, participant_id)
+    participant_name = (
+        db.query(Participant.name).filter(Participant.id == participant_id).scalar()
+    )
+
+    return ResultPdfRenderer.render(
+        participant_name=participant_name,
+        results=results,
+        score_total=pe.score_total,
+        score_max_total=pe.score_max_total,
+        percentual=pe.percentual,
+        badge=pe.badge,
+        inline_css=inline_css,
+    )
+
+
 def get_my_event_result(
     db: Session,
     participant_id: UUID,
 ):
-    pe = (
-        db.query(ParticipantEvent)
+    pe, _ = get_my_event_state(db, participant_id)
+    return pe
+
+
+def get_my_event_state(
+    db: Session,
+    participant_id: UUID,
+):
+    """
+    ParticipantEvent mais recente do participante e se o evento ainda está
+    aberto (decide se o resultado pode ir para o cache).
+    """
+    row = (
+        db.query(ParticipantEvent, Event.is_open)
+        .join(Event, Event.id == ParticipantEvent.event_id)
         .filter(ParticipantEvent.participant_id == participant_id)
         .order_by(ParticipantEvent.updated_at.desc())
         .first()
     )
 
-    if not pe:
+    if not row:
         raise HTTPException(
             status_code=404,
             detail="Nenhum evento encontrado para este participante.",
         )
 
-    return pe
+    return row.ParticipantEvent, row.is_open
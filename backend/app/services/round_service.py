@@ -1,12 +1,76 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import exists, func
 from app.models.evaluation import Evaluation
 from uuid import UUID
 from app.models.round import Round
 from fastapi import HTTPException
+from app.schemas.round import RoundResponse
 from app.services.score_service import ScoreService
+from app.core import broker
+from app.core.cache import MISS, VersionedCache
+from app.core.state_version import answer_key_versions, event_versions
+
+
+# Lista de rounds por evento, consultada em polling pelas telas do
+# sommelier e dos participantes
+_round_lists = VersionedCache(max_entries=64)
+
 
 class RoundService:
+
+    @staticmethod
+    def to_response(round_obj: Round, has_answer_key: bool = False) -> RoundResponse:
+        wine = round_obj.wine
+        return RoundResponse(
+            id=round_obj.id,
+            name=round_obj.name,
+            position=round_obj.position,
+            is_open=round_obj.is_open,
+            answer_released=round_obj.answer_released,
+            event_id=round_obj.event_id,
+            wine_grapes=wine.grapes if wine else None,
+            wine_country=wine.country.value if wine and wine.country else None,
+            wine_vintage=wine.vintage if wine else None,
+            has_answer_key=has_answer_key,
+        )
+
+    @staticmethod
+    def _has_answer_key():
+        return exists().where(
+            Evaluation.round_id == Round.id, Evaluation.is_answer_key.is_(True)
+        )
+
+    @staticmethod
+    def has_answer_key(db: Session, round_id) -> bool:
+        return bool(
+            db.query(RoundService._has_answer_key()).filter(Round.id == round_id).scalar()
+        )
+
+    @staticmethod
+    def build_round_list(db: Session, event_id) -> list[RoundResponse]:
+        """Rounds do evento com o vinho e a presença de gabarito em uma única query."""
+        rows = (
+            db.query(Round, RoundService._has_answer_key().label("has_answer_key"))
+            .options(joinedload(Round.wine))
+            .filter(Round.event_id == event_id)
+            .order_by(Round.position.asc())
+            .all()
+        )
+        return [RoundService.to_response(r, answer_key) for r, answer_key in rows]
+
+    @staticmethod
+    def list_rounds(db: Session, event_id) -> list[RoundResponse]:
+        # rounds e vinhos mudam com event_versions; gabaritos com answer_key_versions
+        # (avaliações pontuadas não mexem na lista). Versões lidas ANTES da
+        # query: se mudarem no meio, a próxima leitura reconstrói.
+        version = (event_versions.get(event_id), answer_key_versions.get(event_id))
+
+        rounds = _round_lists.get(event_id, version)
+        if rounds is MISS:
+            rounds = RoundService.build_round_list(db, event_id)
+            _round_lists.set(event_id, version, rounds)
+
+        return rounds
     
     @staticmethod
     def get_round_ranking(db, round_id):
@@ -75,9 +139,15 @@ class RoundService:
             )
 
         # 3️⃣ Fechar o round
+        event_id = round_obj.event_id
         round_obj.is_open = False
         db.commit()
 
+        version = event_versions.bump(event_id)
+        broker.publish(
+            event_id, broker.ROUND_CLOSED, round_id=round_id, version=version
+        )
+
         return {
             "round_id": round_id,
             "status": "closed",
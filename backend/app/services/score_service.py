@@ -3,10 +3,27 @@ from app.models.participant_event import ParticipantEvent
 from app.models.round import Round  # ajuste import conforme seu projeto
 from app.models.wine import Wine
 from decimal import Decimal, ROUND_HALF_UP
-from sqlalchemy import func
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from app.enums.score import Score
+import uuid
 from app.enums.badge_category import BadgeCategory
+from app.core.cache import results_cache
+from app.core.metrics import timed
+from app.core.state_version import event_versions, score_versions
+from app.services.scoring_rubric import (
+    SCORING_RUBRIC,
+    WINE_NOT_LOADED,
+    compare_descriptors,
+    scorer,
+)
+
+
+# Atributos da avaliação que entram no cálculo do score
+SCORED_ATTRIBUTES = tuple(rule.attribute for rule in SCORING_RUBRIC)
+
+# Linhas por INSERT ... ON CONFLICT (8 parâmetros por linha)
+UPSERT_BATCH_SIZE = 1000
 
 
 class ScoreService:
@@ -15,110 +32,25 @@ class ScoreService:
     def compare_list_attribute(
         participant_value: str | None, answer_key_value: str | None
     ) -> str:
-        participant_set = (
-            set(a.strip().lower() for a in participant_value.split(","))
-            if participant_value
-            else set()
-        )
-        answer_key_set = (
-            set(a.strip().lower() for a in answer_key_value.split(","))
-            if answer_key_value
-            else set()
-        )
-
-        matches = participant_set & answer_key_set
-
-        if not matches:
-            return "wrong"
-        elif matches == answer_key_set:
-            return "correct"
-        else:
-            return "partial"
+        return compare_descriptors(participant_value, answer_key_value)
 
     @staticmethod
-    def calculate_score(evaluation: Evaluation, answer_key: Evaluation, db: Session = None, round_id = None) -> int:
-        score = 0
-
-        if evaluation.limpidity == answer_key.limpidity:
-            score += Score.normal.value
-
-        if evaluation.visualIntensity == answer_key.visualIntensity:
-            score += Score.normal.value
-
-        if evaluation.color_type == answer_key.color_type:
-            score += Score.normal.value
-
-        if evaluation.color_tone == answer_key.color_tone:
-            score += Score.normal.value
-
-        if evaluation.condition == answer_key.condition:
-            score += Score.normal.value
+    def calculate_score(
+        evaluation: Evaluation,
+        answer_key: Evaluation,
+        db: Session = None,
+        round_id=None,
+        wine_grapes=WINE_NOT_LOADED,
+    ) -> int:
+        """
+        Score de uma avaliação segundo a rubrica (app/services/scoring_rubric.py).
+        Com `db` e `round_id` a uva é comparada com as uvas do Wine da rodada;
+        `wine_grapes` pode ser passado já carregado (cálculo em lote).
+        """
+        if wine_grapes is WINE_NOT_LOADED and db and round_id and evaluation.grape is not None:
+            wine_grapes = ScoreService.get_wine_grapes(db, round_id)
 
-        if evaluation.aromaIntensity == answer_key.aromaIntensity:
-            score += Score.normal.value
-
-        if evaluation.aromas is not None and answer_key.aromas is not None:
-            status = ScoreService.compare_list_attribute(
-                evaluation.aromas, answer_key.aromas
-            )
-            if status == "correct":
-                score += Score.descritivos.value
-            elif status == "partial":
-                score += Score.normal.value
-
-        if evaluation.sweetness == answer_key.sweetness:
-            score += Score.normal.value
-
-        # Tannin só é comparado se ambos têm valor (não é branco)
-        if (
-            evaluation.tannin is not None
-            and answer_key.tannin is not None
-            and evaluation.tannin == answer_key.tannin
-        ):
-            score += Score.normal.value
-
-        if evaluation.alcohol == answer_key.alcohol:
-            score += Score.normal.value
-
-        if evaluation.consistence == answer_key.consistence:
-            score += Score.normal.value
-
-        if evaluation.acidity == answer_key.acidity:
-            score += Score.normal.value
-
-        if evaluation.persistence == answer_key.persistence:
-            score += Score.normal.value
-        if evaluation.flavors is not None and answer_key.flavors is not None:
-            status = ScoreService.compare_list_attribute(
-                evaluation.flavors, answer_key.flavors
-            )
-            if status == "correct":
-                score += Score.descritivos.value
-            elif status == "partial":
-                score += Score.normal.value
-        if evaluation.quality == answer_key.quality:
-            score += Score.normal.value
-
-        # Verificar se a uva está na lista de uvas do Wine
-        if evaluation.grape is not None:
-            if db and round_id:
-                wine = db.query(Wine).filter(Wine.round_id == round_id).first()
-                if wine and wine.grapes:
-                    # Comparar se a uva do participante está na lista de uvas do Wine
-                    grape_value = evaluation.grape.value if hasattr(evaluation.grape, 'value') else str(evaluation.grape)
-                    if grape_value in wine.grapes:
-                        score += Score.uva.value
-            elif evaluation.grape == answer_key.grape:
-                # Fallback para compatibilidade: comparar com gabarito se não houver Wine
-                score += Score.uva.value
-
-        if evaluation.country is not None and evaluation.country == answer_key.country:
-            score += Score.pais.value
-
-        if evaluation.vintage is not None and evaluation.vintage == answer_key.vintage:
-            score += Score.safra.value
-
-        return score
+        return scorer.score(evaluation, answer_key, wine_grapes).total
 
     @staticmethod
     def get_answer_key(db: Session, round_id):
@@ -130,6 +62,63 @@ class ScoreService:
         )
 
     @staticmethod
+    def get_wine_grapes(db: Session, round_id):
+        return db.query(Wine.grapes).filter(Wine.round_id == round_id).scalar()
+
+    @staticmethod
+    def compute_round_scores(db: Session, round_id, answer_key: Evaluation):
+        """
+        Calcula os scores de todas as avaliações de participantes da rodada
+        sem carregar entidades ORM: 1 query do vinho + 1 query das colunas
+        pontuadas. Não escreve nada.
+        Retorna [(evaluation_id, participant_id, score_atual, score_novo)].
+        """
+        wine_grapes = ScoreService.get_wine_grapes(db, round_id)
+
+        rows = (
+            db.query(
+                Evaluation.id,
+                Evaluation.participant_id,
+                Evaluation.score,
+                *[getattr(Evaluation, attr).label(attr) for attr in SCORED_ATTRIBUTES],
+            )
+            .filter(
+                Evaluation.round_id == round_id, Evaluation.is_answer_key.is_(False)
+            )
+            .all()
+        )
+
+        return [
+            (
+                row.id,
+                row.participant_id,
+                row.score,
+                ScoreService.calculate_score(row, answer_key, wine_grapes=wine_grapes),
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    @timed("score.rescore_round")
+    def rescore_round(db: Session, round_id, answer_key: Evaluation):
+        """
+        Reescreve os scores da rodada em lote: um único UPDATE executemany
+        (por chave primária) apenas para as avaliações cujo score mudou.
+        """
+        scores = ScoreService.compute_round_scores(db, round_id, answer_key)
+
+        changed = [
+            {"id": evaluation_id, "score": new_score}
+            for evaluation_id, _, old_score, new_score in scores
+            if old_score != new_score
+        ]
+        if changed:
+            db.execute(update(Evaluation), changed)
+
+        return scores
+
+    @staticmethod
+    @timed("score.recalculate_scores")
     def recalculate_scores(db: Session, round_id):
         answer_key = ScoreService.get_answer_key(db, round_id)
         if not answer_key:
@@ -140,27 +129,18 @@ class ScoreService:
         db.add(answer_key)
         db.flush()
 
-        evaluations = (
-            db.query(Evaluation)
-            .filter(
-                Evaluation.round_id == round_id, Evaluation.is_answer_key.is_(False)
-            )
-            .all()
-        )
-
-        for evaluation in evaluations:
-            participant_score = ScoreService.calculate_score(evaluation, answer_key, db=db, round_id=round_id)
-            evaluation.score = participant_score
-            db.add(evaluation)
+        scores = ScoreService.rescore_round(db, round_id, answer_key)
 
-        db.flush()
         # recalcula evento UMA vez, após todos os scores estarem atualizados
         round = db.get(Round, round_id)
-        if round:
-            ScoreService.recalculate_event_totals(db, round.event_id)
+        event_id = round.event_id if round else None
+        if event_id:
+            ScoreService.recalculate_event_totals(db, event_id)
 
         db.commit()
-        return len(evaluations)
+        if event_id:
+            event_versions.bump(event_id)
+        return len(scores)
 
     @staticmethod
     def calculate_score_absolute(answer_key: Evaluation) -> int:
@@ -186,12 +166,262 @@ class ScoreService:
         return chosen
 
     @staticmethod
+    def build_totals_row(participant_id, event_id, score_total: int, score_max_total: int) -> dict:
+        percentual = 0.0
+        if score_max_total > 0:
+            percentual = (score_total / score_max_total) * 100.0
+
+        # arredonda para 2 casas (opcional)
+        percentual = float(
+            Decimal(percentual).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        )
+
+        badge_enum = ScoreService.get_badge(percentual)
+
+        return {
+            "participant_id": participant_id,
+            "event_id": event_id,
+            "score_total": score_total,
+            "score_max_total": score_max_total,
+            "percentual": percentual,
+            "badge": badge_enum.name,
+            "badge_key": badge_enum.value["key"],
+        }
+
+    @staticmethod
+    def upsert_participant_events(db: Session, rows: list[dict]) -> None:
+        """
+        Grava os totais de ParticipantEvent em lote.
+        PostgreSQL: INSERT ... ON CONFLICT (participant_id, event_id) DO UPDATE.
+        Demais bancos (SQLite): 1 SELECT dos existentes + insert/update executemany.
+        """
+        if not rows:
+            return
+
+        if db.get_bind().dialect.name == "postgresql":
+            ScoreService._upsert_on_conflict(db, rows)
+        else:
+            ScoreService._upsert_batched(db, rows)
+
+    @staticmethod
+    def _upsert_on_conflict(db: Session, rows: list[dict]) -> None:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = [
+                {"id": uuid.uuid4(), **row}
+                for row in rows[start : start + UPSERT_BATCH_SIZE]
+            ]
+            stmt = pg_insert(ParticipantEvent).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ParticipantEvent.participant_id, ParticipantEvent.event_id],
+                set_={
+                    "score_total": stmt.excluded.score_total,
+                    "score_max_total": stmt.excluded.score_max_total,
+                    "percentual": stmt.excluded.percentual,
+                    "badge": stmt.excluded.badge,
+                    "badge_key": stmt.excluded.badge_key,
+                    "updated_at": func.now(),
+                },
+            )
+            db.execute(stmt)
+
+    @staticmethod
+    def _upsert_batched(db: Session, rows: list[dict]) -> None:
+        existing = {}
+        for event_id in {row["event_id"] for row in rows}:
+            existing.update(
+                db.query(ParticipantEvent.participant_id, ParticipantEvent.id)
+                .filter(ParticipantEvent.event_id == event_id)
+                .all()
+            )
+
+        to_insert = [row for row in rows if row["participant_id"] not in existing]
+        to_update = [
+            {"id": existing[row["participant_id"]], **row}
+            for row in rows
+            if row["participant_id"] in existing
+        ]
+
+        if to_insert:
+            db.execute(insert(ParticipantEvent), to_insert)
+        if to_update:
+            db.execute(update(ParticipantEvent), to_update)
+
+    @staticmethod
+    @timed("score.recalculate_event_totals")
     def recalculate_event_totals(db: Session, event_id):
         """
         Agrega resultados do evento e atualiza/insere ParticipantEvent.
         Considera apenas rounds que já possuam gabarito (is_answer_key=True) com score calculado.
         Retorna número de participantes atualizados.
         """
+        rows = ScoreService.compute_event_totals(db, event_id)
+        ScoreService.upsert_participant_events(db, rows)
+
+        db.commit()
+        ScoreService.scores_changed(event_id)
+        return len(rows)
+
+    @staticmethod
+    def scores_changed(event_id) -> None:
+        """
+        Chamar após o commit de qualquer mudança de score do evento: nova
+        versão (ranking, resultados) e descarte dos resultados em cache.
+        """
+        score_versions.bump(event_id)
+        results_cache.invalidate_event(event_id)
+
+    @staticmethod
+    def event_score_max_query(event_id):
+        """Soma dos scores máximos (gabaritos) das rodadas do evento, como subquery."""
+        return (
+            select(func.coalesce(func.sum(Evaluation.score), 0))
+            .join(Round, Round.id == Evaluation.round_id)
+            .where(Round.event_id == event_id, Evaluation.is_answer_key.is_(True))
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def get_event_score_max(db: Session, event_id) -> int:
+        """Soma dos scores máximos (gabaritos) das rodadas do evento."""
+        return db.scalar(select(ScoreService.event_score_max_query(event_id))) or 0
+
+    @staticmethod
+    @timed("score.apply_submission_score")
+    def apply_submission_score(db: Session, participant_id, event_id, score: int) -> None:
+        """
+        Modo incremental: soma o score de uma avaliação recém-pontuada ao
+        ParticipantEvent do participante (sem commit, mesma transação).
+        """
+        ScoreService.apply_submission_scores(db, event_id, {participant_id: score})
+
+    @staticmethod
+    @timed("score.apply_submission_scores")
+    def apply_submission_scores(db: Session, event_id, scores: dict) -> None:
+        """
+        Versão em lote: `scores` é {participant_id: soma dos scores novos}.
+        O incremento é feito pelo próprio INSERT ... ON CONFLICT DO UPDATE:
+        envios simultâneos do mesmo participante (inclusive o primeiro,
+        quando a linha ainda não existe) se enfileiram no conflito em vez
+        de falhar ou sobrescrever um ao outro.
+        """
+        if not scores:
+            return
+
+        score_max_total = ScoreService.event_score_max_query(event_id)
+        # ordem fixa: lotes simultâneos travam as linhas na mesma sequência
+        participant_ids = sorted(scores, key=str)
+        stmt = pg_insert(ParticipantEvent).values(
+            [
+                dict(
+                    # percentual/badge provisórios: só valem depois de conhecer os totais
+                    ScoreService.build_totals_row(participant_id, event_id, scores[participant_id], 0),
+                    id=uuid.uuid4(),
+                    score_max_total=score_max_total,
+                )
+                for participant_id in participant_ids
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ParticipantEvent.participant_id, ParticipantEvent.event_id],
+            set_={
+                "score_total": ParticipantEvent.score_total + stmt.excluded.score_total,
+                "updated_at": func.now(),
+            },
+        ).returning(
+            ParticipantEvent.id,
+            ParticipantEvent.participant_id,
+            ParticipantEvent.score_total,
+            ParticipantEvent.score_max_total,
+            ParticipantEvent.percentual,
+            ParticipantEvent.badge_key,
+        )
+
+        # as linhas ficam travadas por esta transação até o commit
+        changed = []
+        for pe in db.execute(stmt):
+            row = ScoreService.build_totals_row(
+                pe.participant_id, event_id, pe.score_total, pe.score_max_total
+            )
+            if (row["percentual"], row["badge_key"]) != (pe.percentual, pe.badge_key):
+                changed.append(
+                    {
+                        "id": pe.id,
+                        "percentual": row["percentual"],
+                        "badge": row["badge"],
+                        "badge_key": row["badge_key"],
+                    }
+                )
+        if changed:
+            db.execute(update(ParticipantEvent), changed)
+
+    @staticmethod
+    @timed("score.apply_answer_key")
+    def apply_answer_key(db: Session, answer_key: Evaluation, event_id) -> None:
+        """
+        Modo incremental: gabarito criado/alterado. Recalcula apenas a
+        contribuição da rodada dele (scores da rodada e score máximo) e
+        ajusta os ParticipantEvent do evento pelo delta (sem commit).
+        """
+        answer_key.score = ScoreService.calculate_score_absolute(answer_key)
+        db.flush()
+
+        scores = ScoreService.rescore_round(db, answer_key.round_id, answer_key)
+        score_max_total = ScoreService.get_event_score_max(db, event_id)
+
+        deltas = {}
+        for _, participant_id, old_score, new_score in scores:
+            deltas[participant_id] = deltas.get(participant_id, 0) + new_score - (old_score or 0)
+
+        current = dict(
+            db.query(ParticipantEvent.participant_id, ParticipantEvent.score_total)
+            .filter(ParticipantEvent.event_id == event_id)
+            .with_for_update()
+            .all()
+        )
+
+        # o score máximo muda para todos do evento, então todos os percentuais também
+        rows = [
+            ScoreService.build_totals_row(
+                participant_id,
+                event_id,
+                current.get(participant_id, 0) + deltas.get(participant_id, 0),
+                score_max_total,
+            )
+            for participant_id in set(current) | set(deltas)
+        ]
+        ScoreService.upsert_participant_events(db, rows)
+
+    @staticmethod
+    def check_event_totals(db: Session, event_id) -> list[tuple]:
+        """
+        Verificador de consistência: compara os ParticipantEvent gravados
+        (possivelmente mantidos de forma incremental) com um recálculo completo.
+        Retorna [(participant_id, gravado, esperado)] das divergências.
+        """
+        columns = ("score_total", "score_max_total", "percentual", "badge", "badge_key")
+
+        expected = {
+            row["participant_id"]: tuple(row[col] for col in columns)
+            for row in ScoreService.compute_event_totals(db, event_id)
+        }
+        stored = {
+            pe.participant_id: tuple(getattr(pe, col) for col in columns)
+            for pe in db.query(ParticipantEvent)
+            .filter(ParticipantEvent.event_id == event_id)
+            .all()
+        }
+
+        return [
+            (participant_id, stored.get(participant_id), expected.get(participant_id))
+            for participant_id in set(expected) | set(stored)
+            if stored.get(participant_id) != expected.get(participant_id)
+        ]
+
+    @staticmethod
+    def compute_event_totals(db: Session, event_id) -> list[dict]:
+        """
+        Totais do evento por participante (linhas de ParticipantEvent), sem gravar.
+        """
         # 1) buscar rounds do evento que tenham gabarito com score não-nulo
         rounds_with_answer = (
             db.query(Round.id)
@@ -206,7 +436,7 @@ class ScoreService:
         )
         round_ids = [r.id for r in rounds_with_answer]
         if not round_ids:
-            return 0
+            return []
 
         # 2) soma dos scores máximos (gabaritos) para essas rounds
         score_max_total = (
@@ -230,53 +460,10 @@ class ScoreService:
             .all()
         )
 
-        # 4) atualizar / inserir ParticipantEvent
-        updated_count = 0
-        for row in participant_scores:
-            participant_id = row.participant_id
-            score_total = int(row.score_total or 0)
-
-            percentual = 0.0
-            if score_max_total > 0:
-                percentual = (score_total / score_max_total) * 100.0
-
-            # arredonda para 2 casas (opcional)
-            percentual = float(
-                Decimal(percentual).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            )
-
-            badge_enum = ScoreService.get_badge(percentual)
-            badge = badge_enum.name
-            badge_key = badge_enum.value["key"]
-
-            pe = (
-                db.query(ParticipantEvent)
-                .filter(
-                    ParticipantEvent.participant_id == participant_id,
-                    ParticipantEvent.event_id == event_id,
-                )
-                .first()
+        # 4) percentual e badge calculados em uma passada
+        return [
+            ScoreService.build_totals_row(
+                row.participant_id, event_id, int(row.score_total or 0), score_max_total
             )
-
-            if not pe:
-                pe = ParticipantEvent(
-                    participant_id=participant_id,
-                    event_id=event_id,
-                    score_total=score_total,
-                    score_max_total=score_max_total,
-                    percentual=percentual,
-                    badge=badge,
-                    badge_key=badge_key,
-                )
-                db.add(pe)
-            else:
-                pe.score_total = score_total
-                pe.score_max_total = score_max_total
-                pe.percentual = percentual
-                pe.badge = badge
-                db.add(pe)
-
-            updated_count += 1
-
-        db.commit()
-        return updated_count
+            for row in participant_scores
+        ]
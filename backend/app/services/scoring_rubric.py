@@ -0,0 +1,172 @@
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Dict, NamedTuple, Optional
+
+from app.enums.score import Score
+
+
+CORRECT = "correct"
+PARTIAL = "partial"
+WRONG = "wrong"
+
+# Tipos de comparação suportados pela rubrica
+EXACT = "exact"  # igualdade simples
+BOTH_PRESENT = "both_present"  # só pontua se os dois lados têm valor (tanino)
+DESCRIPTORS = "descriptors"  # lista separada por vírgula, aceita acerto parcial
+OPTIONAL = "optional"  # campo opcional do participante (país, safra)
+GRAPE = "grape"  # uva do participante contra as uvas do Wine da rodada
+
+# Marca "uvas do vinho ainda não consultadas" (None significa rodada sem Wine)
+WINE_NOT_LOADED = object()
+
+
+@dataclass(frozen=True)
+class RubricRule:
+    attribute: str
+    kind: str
+    weight: Score
+    partial_weight: Optional[Score] = None
+
+
+SCORING_RUBRIC = (
+    # Visual
+    RubricRule("limpidity", EXACT, Score.normal),
+    RubricRule("visualIntensity", EXACT, Score.normal),
+    RubricRule("color_type", EXACT, Score.normal),
+    RubricRule("color_tone", EXACT, Score.normal),
+    # Olfativo
+    RubricRule("condition", EXACT, Score.normal),
+    RubricRule("aromaIntensity", EXACT, Score.normal),
+    RubricRule("aromas", DESCRIPTORS, Score.descritivos, Score.normal),
+    # Gustativo
+    RubricRule("sweetness", EXACT, Score.normal),
+    RubricRule("tannin", BOTH_PRESENT, Score.normal),
+    RubricRule("alcohol", EXACT, Score.normal),
+    RubricRule("consistence", EXACT, Score.normal),
+    RubricRule("acidity", EXACT, Score.normal),
+    RubricRule("persistence", EXACT, Score.normal),
+    RubricRule("flavors", DESCRIPTORS, Score.descritivos, Score.normal),
+    # Informações gerais
+    RubricRule("quality", EXACT, Score.normal),
+    RubricRule("grape", GRAPE, Score.uva),
+    RubricRule("country", OPTIONAL, Score.pais),
+    RubricRule("vintage", OPTIONAL, Score.safra),
+)
+
+
+def split_descriptors(value: str | None) -> set:
+    if not value:
+        return set()
+    return set(a.strip().lower() for a in value.split(","))
+
+
+def compare_descriptors(participant_value: str | None, answer_key_value: str | None) -> str:
+    answer_key_set = split_descriptors(answer_key_value)
+    matches = split_descriptors(participant_value) & answer_key_set
+
+    if not matches:
+        return WRONG
+    elif matches == answer_key_set:
+        return CORRECT
+    else:
+        return PARTIAL
+
+
+# Cada fábrica recebe a regra e devolve compare(participante, gabarito, uvas) -> (status, pontos)
+
+def _exact(rule: RubricRule):
+    points = rule.weight.value
+
+    def compare(participant_value, answer_key_value, wine_grapes):
+        if participant_value == answer_key_value:
+            return CORRECT, points
+        return WRONG, 0
+
+    return compare
+
+
+def _present_and_equal(rule: RubricRule):
+    # BOTH_PRESENT (tanino) e OPTIONAL (país, safra) pontuam igual: só
+    # com valor presente e igual ao do gabarito
+    points = rule.weight.value
+
+    def compare(participant_value, answer_key_value, wine_grapes):
+        if participant_value != answer_key_value:
+            return WRONG, 0
+        # ambos vazios (vinho branco, campo não informado) contam como acerto, mas sem pontos
+        return CORRECT, points if participant_value is not None else 0
+
+    return compare
+
+
+def _descriptors(rule: RubricRule):
+    points = {CORRECT: rule.weight.value, PARTIAL: rule.partial_weight.value, WRONG: 0}
+
+    def compare(participant_value, answer_key_value, wine_grapes):
+        status = compare_descriptors(participant_value, answer_key_value)
+        return status, points[status]
+
+    return compare
+
+
+def _grape(rule: RubricRule):
+    points = rule.weight.value
+
+    def compare(participant_value, answer_key_value, wine_grapes):
+        if participant_value is None:
+            return (CORRECT if answer_key_value is None else WRONG), 0
+
+        if wine_grapes is WINE_NOT_LOADED:
+            # sem Wine consultado: compara com a uva do gabarito
+            hit = participant_value == answer_key_value
+        else:
+            # blends: qualquer uva do Wine da rodada é acerto
+            grape_value = getattr(participant_value, "value", participant_value)
+            hit = bool(wine_grapes) and grape_value in wine_grapes
+
+        return (CORRECT, points) if hit else (WRONG, 0)
+
+    return compare
+
+
+COMPARATORS = {
+    EXACT: _exact,
+    BOTH_PRESENT: _present_and_equal,
+    DESCRIPTORS: _descriptors,
+    OPTIONAL: _present_and_equal,
+    GRAPE: _grape,
+}
+
+
+class ScoreResult(NamedTuple):
+    total: int
+    statuses: Dict[str, str]
+
+
+class CompiledRubric:
+    """
+    Rubrica compilada: cada regra vira um par (getter, comparador) montado
+    uma única vez, e `score` percorre o plano em uma passada produzindo o
+    total e o status de cada atributo.
+    """
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self._plan = tuple(
+            (rule.attribute, attrgetter(rule.attribute), COMPARATORS[rule.kind](rule))
+            for rule in self.rules
+        )
+
+    def score(self, evaluation, answer_key, wine_grapes=WINE_NOT_LOADED) -> ScoreResult:
+        total = 0
+        statuses = {}
+
+        for attribute, get, compare in self._plan:
+            status, points = compare(get(evaluation), get(answer_key), wine_grapes)
+            statuses[attribute] = status
+            total += points
+
+        return ScoreResult(total, statuses)
+
+
+scorer = CompiledRubric(SCORING_RUBRIC)
@@ -0,0 +1,169 @@
+"""
+Compara o ranking antigo (GROUP BY sobre evaluations a cada requisição)
+com o LeaderboardService (ParticipantEvent + cache em memória).
+
+Cria um evento sintético dentro de uma transação que é desfeita ao
+final, então pode rodar contra um banco de desenvolvimento.
+
+Uso:
+    python -m scripts.bench_leaderboard [--sizes 1000 10000] [--rounds 5] [--repeat 20]
+"""
+import argparse
+import random
+import time
+import uuid
+
+from sqlalchemy import func, insert
+
+from app.core.database import SessionLocal
+from app.core.state_version import score_versions
+from app.enums.color_tone import ColorTone
+from app.enums.color_type import ColorType
+from app.enums.condition import Condition
+from app.enums.limpidity import Limpidity
+from app.enums.quality import Quality
+from app.enums.sweetness import Sweetness
+from app.models.evaluation import Evaluation
+from app.models.event import Event
+from app.models.participant import Participant
+from app.models.participant_event import ParticipantEvent
+from app.models.round import Round
+from app.services.leaderboard_service import LeaderboardService
+from app.services.score_service import ScoreService
+
+
+EVALUATION_DEFAULTS = dict(
+    limpidity=list(Limpidity)[0],
+    visualIntensity=3,
+    color_type=list(ColorType)[0],
+    color_tone=list(ColorTone)[0],
+    condition=list(Condition)[0],
+    aromaIntensity=3,
+    sweetness=list(Sweetness)[0],
+    alcohol=3,
+    consistence=3,
+    acidity=3,
+    persistence=3,
+    quality=list(Quality)[0],
+)
+
+
+def legacy_ranking(db, event_id):
+    """Query usada pelo endpoint antes do leaderboard materializado (sem o limit 3)."""
+    return (
+        db.query(
+            Participant.id.label("participant_id"),
+            Participant.name.label("participant_name"),
+            ParticipantEvent.percentual.label("participant_percentual"),
+            func.sum(Evaluation.score).label("total_score"),
+        )
+        .join(Evaluation, Evaluation.participant_id == Participant.id)
+        .join(Round, Round.id == Evaluation.round_id)
+        .join(ParticipantEvent, ParticipantEvent.participant_id == Participant.id)
+        .filter(Round.event_id == event_id, Evaluation.is_answer_key.is_(False))
+        .group_by(Participant.id, Participant.name, ParticipantEvent.percentual)
+        .order_by(func.sum(Evaluation.score).desc())
+        .all()
+    )
+
+
+def seed_event(db, participants: int, rounds: int):
+    event_id = uuid.uuid4()
+    db.execute(insert(Event), [{"id": event_id, "name": "bench", "access_code": None}])
+
+    round_ids = [uuid.uuid4() for _ in range(rounds)]
+    db.execute(
+        insert(Round),
+        [
+            {"id": round_id, "event_id": event_id, "name": f"R{i}", "position": i}
+            for i, round_id in enumerate(round_ids, start=1)
+        ],
+    )
+
+    participant_ids = [uuid.uuid4() for _ in range(participants)]
+    db.execute(
+        insert(Participant),
+        [
+            {"id": participant_id, "event_id": event_id, "name": f"P{i:06d}"}
+            for i, participant_id in enumerate(participant_ids)
+        ],
+    )
+
+    # gabaritos: sem eles o evento não tem totais
+    sommelier_id = uuid.uuid4()
+    db.execute(insert(Participant), [{"id": sommelier_id, "name": "bench-sommelier"}])
+    answer_keys = [
+        dict(
+            EVALUATION_DEFAULTS,
+            id=uuid.uuid4(),
+            participant_id=sommelier_id,
+            round_id=round_id,
+            is_answer_key=True,
+            score=200,
+        )
+        for round_id in round_ids
+    ]
+
+    db.execute(
+        insert(Evaluation),
+        answer_keys
+        + [
+            dict(
+                EVALUATION_DEFAULTS,
+                id=uuid.uuid4(),
+                participant_id=participant_id,
+                round_id=round_id,
+                score=random.randint(0, 200),
+            )
+            for participant_id in participant_ids
+            for round_id in round_ids
+        ],
+    )
+
+    ScoreService.upsert_participant_events(db, ScoreService.compute_event_totals(db, event_id))
+    db.flush()
+    return event_id
+
+
+def timed(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        db = SessionLocal()
+        try:
+            event_id = seed_event(db, size, args.rounds)
+            assert len(LeaderboardService.build(db, event_id)) == size
+
+            legacy_ms = timed(lambda: legacy_ranking(db, event_id), args.repeat)
+            build_ms = timed(lambda: LeaderboardService.build(db, event_id), args.repeat)
+
+            def cold():
+                score_versions.bump(event_id)
+                LeaderboardService.page(db, event_id, limit=3)
+
+            cold_ms = timed(cold, args.repeat)
+            warm_ms = timed(lambda: LeaderboardService.page(db, event_id, limit=3), args.repeat)
+        finally:
+            db.rollback()
+            db.close()
+
+        print(
+            f"{size} participantes x {args.rounds} rodadas: "
+            f"legado={legacy_ms:.2f}ms materializado={build_ms:.2f}ms "
+            f"cache frio={cold_ms:.2f}ms cache quente={warm_ms:.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
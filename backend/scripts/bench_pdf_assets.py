@@ -0,0 +1,91 @@
+"""
+Micro-benchmark do ResultPdfRenderer.render: imagens lidas e codificadas
+a cada chamada (como era antes) x registro de assets pré-codificados,
+com e sem redução para o tamanho exibido. Não precisa de banco.
+
+Uso:
+    python -m scripts.bench_pdf_assets [--repeat 50] [--rounds 5]
+"""
+import argparse
+import base64
+import time
+
+from app.core import assets as assets_module
+from app.core.assets import ASSETS_DIR, AssetRegistry
+from app.enums.badge_category import BadgeCategory
+from app.services import pdf_result_renderer
+from app.services.pdf_result_renderer import ResultPdfRenderer
+
+
+def legacy_encode(badge: str) -> int:
+    """Leituras feitas pelo render antigo: logo, badge do cabeçalho e os 5 badges."""
+    total = 0
+    for name in ["logo_app.png", f"{badge}.png"] + [
+        f"{category.value['key']}.png" for category in BadgeCategory
+    ]:
+        with open(ASSETS_DIR / name, "rb") as f:
+            total += len(base64.b64encode(f.read()).decode("utf-8"))
+    return total
+
+
+def sample_results(rounds: int) -> list[dict]:
+    item = {"label": "Aromas", "participant": "Cereja", "answer_key": "Cereja", "status": "correct"}
+    return [
+        {
+            "round_name": f"Round {i}",
+            "event_name": "Benchmark",
+            "blocks": [{"label": "Olfativo", "items": [item] * 5} for _ in range(4)],
+        }
+        for i in range(1, rounds + 1)
+    ]
+
+
+def render(results) -> str:
+    return ResultPdfRenderer.render(
+        participant_name="Participante",
+        results=results,
+        score_total=150,
+        score_max_total=212,
+        percentual=70.8,
+        badge="especialista",
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = sample_results(args.rounds)
+
+    legacy_ms = timed(lambda: legacy_encode("especialista"), args.repeat)
+    print(f"antes (7 leituras + base64 por chamada): {legacy_ms:.2f}ms só nas imagens")
+
+    for label, scale in (("originais", 0), ("reduzidas", 2)):
+        registry = AssetRegistry(ASSETS_DIR, scale=scale, reload_interval=5)
+        # o renderer usa o singleton do módulo (e guarda a tabela de perfis)
+        assets_module.assets = pdf_result_renderer.assets = registry
+        pdf_result_renderer._profiles_html.clear()
+
+        t0 = time.perf_counter()
+        ResultPdfRenderer.preload_assets()
+        preload_ms = (time.perf_counter() - t0) * 1000
+
+        render_ms = timed(lambda: render(results), args.repeat)
+        size_kb = len(render(results).encode()) / 1024
+        print(
+            f"registro ({label}): preload={preload_ms:.0f}ms "
+            f"render={render_ms:.2f}ms html={size_kb:.0f}KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark da conversão HTML -> PDF: N relatórios renderizados como antes
+(HTML com <style>, HTML(string=...).write_pdf() a cada vez) e com o
+PdfGenerator compartilhado (fontes e CSS parseados uma vez por processo).
+Não precisa de banco.
+
+Uso:
+    python -m scripts.bench_pdf_render [--reports 100] [--rounds 5] [--verbose]
+"""
+import argparse
+import statistics
+import time
+
+from weasyprint import HTML
+
+from app.services.pdf_generator import PdfGenerator, print_render_stats
+from app.services.pdf_result_renderer import STYLESHEET_PATH, ResultPdfRenderer
+from scripts.bench_pdf_assets import sample_results
+
+
+def report_html(results, inline_css: bool) -> str:
+    return ResultPdfRenderer.render(
+        participant_name="Participante",
+        results=results,
+        score_total=150,
+        score_max_total=212,
+        percentual=70.8,
+        badge="especialista",
+        inline_css=inline_css,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--verbose", action="store_true", help="imprime as etapas de cada PDF")
+    args = parser.parse_args(argv)
+
+    results = sample_results(args.rounds)
+    ResultPdfRenderer.preload_assets()
+
+    inline_html = report_html(results, inline_css=True)
+    t0 = time.perf_counter()
+    for _ in range(args.reports):
+        HTML(string=inline_html).write_pdf()
+    legacy_ms = (time.perf_counter() - t0) * 1000
+
+    html = report_html(results, inline_css=False)
+    collected = []
+    t0 = time.perf_counter()
+    for _ in range(args.reports):
+        _, stats = PdfGenerator.render(html, STYLESHEET_PATH)
+        collected.append(stats)
+        if args.verbose:
+            print_render_stats(stats)
+    shared_ms = (time.perf_counter() - t0) * 1000
+
+    def median(attr):
+        return statistics.median(getattr(s, attr) for s in collected)
+
+    print(f"{args.reports} relatórios, {args.rounds} rodadas cada")
+    print(f"antes:        {legacy_ms / args.reports:.1f}ms/PDF")
+    print(f"compartilhado: {shared_ms / args.reports:.1f}ms/PDF")
+    print(
+        f"  mediana parse={median('parse_ms'):.1f}ms layout={median('layout_ms'):.1f}ms "
+        f"write={median('write_ms'):.1f}ms tamanho={median('bytes') / 1024:.0f}KB"
+    )
+    print(f"  primeiro PDF (parse do CSS + fontes): parse={collected[0].parse_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
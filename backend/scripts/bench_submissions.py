@@ -0,0 +1,205 @@
+"""
+Compara o envio de avaliações antigo (commit, refresh, busca do
+gabarito e do Wine, segundo commit) com EvaluationService.submit
+(score calculado antes do INSERT ... ON CONFLICT, um commit) e com o
+envio em lote (EvaluationService.submit_batch, --batch-size por lote).
+
+Cria um evento sintético com uma rodada (com Wine e gabarito) por modo,
+envia uma avaliação por participante em cada uma e apaga tudo ao final.
+
+Uso:
+    python -m scripts.bench_submissions [--participants 500] [--concurrency 1 8] [--batch-size 50]
+"""
+import argparse
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete, event, insert
+
+import app.main  # noqa: F401  (configura os mappers)
+from app.core import config
+from app.core.database import SessionLocal, engine
+from app.enums.user_role import UserRole
+from app.models.evaluation import Evaluation
+from app.models.event import Event
+from app.models.participant import Participant
+from app.models.participant_event import ParticipantEvent
+from app.models.round import Round
+from app.models.wine import Wine
+from app.schemas.evaluation import EvaluationCreate
+from app.services.evaluation_service import EvaluationService
+from app.services.score_service import ScoreService
+
+
+PAYLOAD = dict(
+    limpidity="limpido",
+    visualIntensity=3,
+    color_type="tinto",
+    color_tone="rubi",
+    condition="correto",
+    aromaIntensity=3,
+    aromas="cereja, ameixa",
+    sweetness="seco",
+    tannin=3,
+    alcohol=3,
+    consistence=3,
+    acidity=3,
+    persistence=3,
+    flavors="cereja",
+    quality="boa",
+    grape="Syrah",
+)
+
+
+def legacy_submit(db, payload: EvaluationCreate):
+    """Caminho do participante em EvaluationService.create antes do envio em uma transação."""
+    evaluation = Evaluation(**EvaluationService.build_values(payload))
+    db.add(evaluation)
+    db.commit()
+    db.refresh(evaluation)
+
+    answer_key = EvaluationService.get_answer_key(db, evaluation.round_id)
+    if answer_key:
+        evaluation.score = ScoreService.calculate_score(
+            evaluation, answer_key, db=db, round_id=evaluation.round_id
+        )
+        event_id = None
+        if config.INCREMENTAL_EVENT_TOTALS:
+            event_id = EvaluationService.get_event_id(db, evaluation.round_id)
+            ScoreService.apply_submission_score(
+                db, evaluation.participant_id, event_id, evaluation.score
+            )
+        db.commit()
+        db.refresh(evaluation)
+        if event_id:
+            ScoreService.scores_changed(event_id)
+    return evaluation
+
+
+def seed_event(participants: int, modes) -> tuple:
+    event_id = uuid.uuid4()
+    round_ids = {mode: uuid.uuid4() for mode in modes}
+    participant_ids = [uuid.uuid4() for _ in range(participants)]
+    sommelier_id = uuid.uuid4()
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(Event), [{"id": event_id, "name": "bench", "access_code": None}])
+        db.execute(
+            insert(Round),
+            [
+                {"id": round_id, "event_id": event_id, "name": mode, "position": i}
+                for i, (mode, round_id) in enumerate(round_ids.items(), start=1)
+            ],
+        )
+        db.execute(
+            insert(Wine),
+            [{"id": uuid.uuid4(), "round_id": round_id, "grapes": ["Syrah"]} for round_id in round_ids.values()],
+        )
+        db.execute(
+            insert(Participant),
+            [{"id": sommelier_id, "event_id": event_id, "name": "bench-sommelier", "role": UserRole.SOMMELIER}]
+            + [
+                {"id": participant_id, "event_id": event_id, "name": f"P{i:06d}"}
+                for i, participant_id in enumerate(participant_ids)
+            ],
+        )
+        db.commit()
+
+        for round_id in round_ids.values():
+            EvaluationService.create(
+                db, EvaluationCreate(**PAYLOAD, participant_id=sommelier_id, round_id=round_id, is_answer_key=True)
+            )
+    finally:
+        db.close()
+    return event_id, round_ids, participant_ids
+
+
+def drop_event(event_id) -> None:
+    db = SessionLocal()
+    try:
+        round_ids = [r.id for r in db.query(Round.id).filter(Round.event_id == event_id)]
+        db.execute(delete(Evaluation).where(Evaluation.round_id.in_(round_ids)))
+        db.execute(delete(Wine).where(Wine.round_id.in_(round_ids)))
+        db.execute(delete(ParticipantEvent).where(ParticipantEvent.event_id == event_id))
+        db.execute(delete(Round).where(Round.event_id == event_id))
+        db.execute(delete(Participant).where(Participant.event_id == event_id))
+        db.execute(delete(Event).where(Event.id == event_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(fn, round_id, participant_ids, concurrency: int, batch_size: int = 0) -> float:
+    def one(participant_id):
+        db = SessionLocal()
+        try:
+            fn(db, EvaluationCreate(**PAYLOAD, participant_id=participant_id, round_id=round_id))
+        finally:
+            db.close()
+
+    def batch(chunk):
+        db = SessionLocal()
+        try:
+            items = [
+                (i, uuid.uuid4().hex, EvaluationCreate(**PAYLOAD, participant_id=participant_id, round_id=round_id))
+                for i, participant_id in enumerate(chunk)
+            ]
+            fn(db, items)
+        finally:
+            db.close()
+
+    if batch_size:
+        work, tasks = batch, [
+            participant_ids[i : i + batch_size] for i in range(0, len(participant_ids), batch_size)
+        ]
+    else:
+        work, tasks = one, participant_ids
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(work, tasks))
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--participants", type=int, default=500)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        statements[0] += 1
+
+    modes = {"legado": legacy_submit, "atual": EvaluationService.submit, "lote": EvaluationService.submit_batch}
+
+    for concurrency in args.concurrency:
+        event_id, round_ids, participant_ids = seed_event(args.participants, modes)
+        try:
+            for mode, fn in modes.items():
+                statements[0] = 0
+                batch_size = args.batch_size if mode == "lote" else 0
+                elapsed = run(fn, round_ids[mode], participant_ids, concurrency, batch_size)
+                print(
+                    f"{mode:>6} concorrência {concurrency}: {args.participants / elapsed:.0f} envios/s "
+                    f"({elapsed / args.participants * 1000:.2f}ms cada, "
+                    f"{statements[0] / args.participants:.1f} queries por envio)"
+                )
+
+            db = SessionLocal()
+            try:
+                mismatches = ScoreService.check_event_totals(db, event_id)
+            finally:
+                db.close()
+            print(f"       totais divergentes do recálculo completo: {len(mismatches)}")
+        finally:
+            drop_event(event_id)
+
+
+if __name__ == "__main__":
+    main()
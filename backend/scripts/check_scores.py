@@ -0,0 +1,400 @@
+"""
+Verificações de consistência dos scores.
+
+Uso:
+    python -m scripts.check_scores parity <round_id>
+    python -m scripts.check_scores batch [<event_id> ...]
+    python -m scripts.check_scores upsert <event_id>
+    python -m scripts.check_scores totals <event_id>
+    python -m scripts.check_scores rubric [--pairs 20000] [--seed N]
+"""
+import argparse
+import random
+import sys
+from types import SimpleNamespace
+from uuid import UUID
+
+from app.core.database import SessionLocal
+from app.models.event import Event  # noqa: F401 (registra os mappers)
+from app.models.participant import Participant  # noqa: F401
+from app.models.evaluation import Evaluation
+from app.models.participant_event import ParticipantEvent
+from app.models.wine import Wine
+from app.enums.color_tone import ColorTone
+from app.enums.color_type import ColorType
+from app.enums.condition import Condition
+from app.enums.country import Country
+from app.enums.grape import Grape
+from app.enums.limpidity import Limpidity
+from app.enums.quality import Quality
+from app.enums.score import Score
+from app.enums.sweetness import Sweetness
+from app.services.score_service import ScoreService
+from app.services.scoring_rubric import WINE_NOT_LOADED
+from app.services.batch_scorer import BatchScorer
+
+
+# Referência independente: o calculate_score original (cadeia de ifs),
+# anterior à rubrica declarativa. Única mudança: as uvas do Wine chegam
+# por parâmetro (`wine_grapes`) em vez da query por round_id. Não alterar
+# junto com a rubrica, senão as verificações comparam o código consigo mesmo.
+
+def legacy_compare_list_attribute(participant_value, answer_key_value) -> str:
+    participant_set = (
+        set(a.strip().lower() for a in participant_value.split(","))
+        if participant_value
+        else set()
+    )
+    answer_key_set = (
+        set(a.strip().lower() for a in answer_key_value.split(","))
+        if answer_key_value
+        else set()
+    )
+
+    matches = participant_set & answer_key_set
+
+    if not matches:
+        return "wrong"
+    elif matches == answer_key_set:
+        return "correct"
+    else:
+        return "partial"
+
+
+def legacy_calculate_score(evaluation, answer_key, wine_grapes=WINE_NOT_LOADED) -> int:
+    score = 0
+
+    if evaluation.limpidity == answer_key.limpidity:
+        score += Score.normal.value
+
+    if evaluation.visualIntensity == answer_key.visualIntensity:
+        score += Score.normal.value
+
+    if evaluation.color_type == answer_key.color_type:
+        score += Score.normal.value
+
+    if evaluation.color_tone == answer_key.color_tone:
+        score += Score.normal.value
+
+    if evaluation.condition == answer_key.condition:
+        score += Score.normal.value
+
+    if evaluation.aromaIntensity == answer_key.aromaIntensity:
+        score += Score.normal.value
+
+    if evaluation.aromas is not None and answer_key.aromas is not None:
+        status = legacy_compare_list_attribute(evaluation.aromas, answer_key.aromas)
+        if status == "correct":
+            score += Score.descritivos.value
+        elif status == "partial":
+            score += Score.normal.value
+
+    if evaluation.sweetness == answer_key.sweetness:
+        score += Score.normal.value
+
+    # Tannin só é comparado se ambos têm valor (não é branco)
+    if (
+        evaluation.tannin is not None
+        and answer_key.tannin is not None
+        and evaluation.tannin == answer_key.tannin
+    ):
+        score += Score.normal.value
+
+    if evaluation.alcohol == answer_key.alcohol:
+        score += Score.normal.value
+
+    if evaluation.consistence == answer_key.consistence:
+        score += Score.normal.value
+
+    if evaluation.acidity == answer_key.acidity:
+        score += Score.normal.value
+
+    if evaluation.persistence == answer_key.persistence:
+        score += Score.normal.value
+    if evaluation.flavors is not None and answer_key.flavors is not None:
+        status = legacy_compare_list_attribute(evaluation.flavors, answer_key.flavors)
+        if status == "correct":
+            score += Score.descritivos.value
+        elif status == "partial":
+            score += Score.normal.value
+    if evaluation.quality == answer_key.quality:
+        score += Score.normal.value
+
+    # Verificar se a uva está na lista de uvas do Wine
+    if evaluation.grape is not None:
+        if wine_grapes is not WINE_NOT_LOADED:  # original: `if db and round_id` + query do Wine
+            if wine_grapes:
+                grape_value = evaluation.grape.value if hasattr(evaluation.grape, 'value') else str(evaluation.grape)
+                if grape_value in wine_grapes:
+                    score += Score.uva.value
+        elif evaluation.grape == answer_key.grape:
+            # Fallback para compatibilidade: comparar com gabarito se não houver Wine
+            score += Score.uva.value
+
+    if evaluation.country is not None and evaluation.country == answer_key.country:
+        score += Score.pais.value
+
+    if evaluation.vintage is not None and evaluation.vintage == answer_key.vintage:
+        score += Score.safra.value
+
+    return score
+
+
+def _wine_grapes(db, round_id):
+    return db.query(Wine.grapes).filter(Wine.round_id == round_id).scalar()
+
+
+def check_round_parity(db, round_id) -> int:
+    """
+    Compara o cálculo em lote (ScoreService.compute_round_scores) com a
+    referência original (legacy_calculate_score avaliação por avaliação).
+    Retorna o número de divergências.
+    """
+    answer_key = ScoreService.get_answer_key(db, round_id)
+    if not answer_key:
+        print(f"Rodada {round_id} sem gabarito.")
+        return 0
+
+    bulk_scores = {
+        evaluation_id: new_score
+        for evaluation_id, _, _, new_score in ScoreService.compute_round_scores(
+            db, round_id, answer_key
+        )
+    }
+
+    evaluations = (
+        db.query(Evaluation)
+        .filter(Evaluation.round_id == round_id, Evaluation.is_answer_key.is_(False))
+        .all()
+    )
+
+    wine_grapes = _wine_grapes(db, round_id)
+    mismatches = 0
+    for evaluation in evaluations:
+        expected = legacy_calculate_score(evaluation, answer_key, wine_grapes)
+        got = bulk_scores.get(evaluation.id)
+        if got != expected:
+            mismatches += 1
+            print(f"Divergência em {evaluation.id}: referência={expected} lote={got}")
+
+    print(f"{len(evaluations)} avaliações comparadas, {mismatches} divergência(s).")
+    return mismatches
+
+
+def check_batch_parity(db, event_ids=None) -> int:
+    """
+    Compara o BatchScorer (NumPy) com a referência original
+    (legacy_calculate_score) avaliação por avaliação.
+    """
+    result = BatchScorer.score(db, event_ids)
+
+    answer_keys, wines = {}, {}
+    mismatches = 0
+    for i, evaluation_id in enumerate(result.evaluation_ids):
+        evaluation = db.get(Evaluation, evaluation_id)
+        round_id = evaluation.round_id
+        if round_id not in answer_keys:
+            answer_keys[round_id] = ScoreService.get_answer_key(db, round_id)
+            wines[round_id] = _wine_grapes(db, round_id)
+
+        expected = legacy_calculate_score(evaluation, answer_keys[round_id], wines[round_id])
+        if int(result.scores[i]) != expected:
+            mismatches += 1
+            print(
+                f"Divergência em {evaluation_id}: referência={expected} "
+                f"lote={int(result.scores[i])}"
+            )
+
+    print(f"{len(result.evaluation_ids)} avaliações comparadas, {mismatches} divergência(s).")
+    return mismatches
+
+
+# Pools pequenos de propósito: com poucas opções por atributo, boa parte
+# dos pares acerta (ou erra por pouco), exercitando todos os ramos.
+DESCRIPTOR_WORDS = ("cereja", "ameixa", "baunilha", "couro", "Tabaco ", "limão")
+RANDOM_ENUMS = {
+    "limpidity": list(Limpidity),
+    "color_type": list(ColorType),
+    "color_tone": list(ColorTone)[:3],
+    "condition": list(Condition),
+    "sweetness": list(Sweetness),
+    "quality": list(Quality)[:3],
+}
+RANDOM_GRAPES = list(Grape)[:4]
+RANDOM_COUNTRIES = list(Country)[:3]
+
+
+def _random_descriptors(rng):
+    if rng.random() < 0.15:
+        return rng.choice((None, ""))
+    return ", ".join(rng.sample(DESCRIPTOR_WORDS, rng.randint(1, 3)))
+
+
+def _maybe(rng, value, chance=0.2):
+    return None if rng.random() < chance else value
+
+
+def _random_evaluation(rng):
+    values = {attribute: rng.choice(pool) for attribute, pool in RANDOM_ENUMS.items()}
+    for attribute in ("visualIntensity", "aromaIntensity", "alcohol", "consistence", "acidity", "persistence"):
+        values[attribute] = rng.randint(1, 3)
+    values["tannin"] = _maybe(rng, rng.randint(1, 3))
+    values["aromas"] = _random_descriptors(rng)
+    values["flavors"] = _random_descriptors(rng)
+    values["grape"] = _maybe(rng, rng.choice(RANDOM_GRAPES))
+    values["country"] = _maybe(rng, rng.choice(RANDOM_COUNTRIES))
+    values["vintage"] = _maybe(rng, rng.choice((2018, 2019)))
+    return SimpleNamespace(**values)
+
+
+def _random_wine_grapes(rng):
+    choice = rng.random()
+    if choice < 0.3:
+        return WINE_NOT_LOADED
+    if choice < 0.4:
+        return None  # rodada sem Wine
+    if choice < 0.5:
+        return []
+    return [g.value for g in rng.sample(RANDOM_GRAPES, rng.randint(1, 2))]
+
+
+def check_rubric_parity(pairs: int = 20000, seed=None) -> int:
+    """
+    Compara a rubrica (ScoreService.calculate_score) com a referência
+    original (legacy_calculate_score) em pares avaliação/gabarito
+    aleatórios, sem banco. Retorna o número de divergências.
+    """
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(pairs):
+        evaluation, answer_key = _random_evaluation(rng), _random_evaluation(rng)
+        wine_grapes = _random_wine_grapes(rng)
+
+        expected = legacy_calculate_score(evaluation, answer_key, wine_grapes)
+        got = ScoreService.calculate_score(evaluation, answer_key, wine_grapes=wine_grapes)
+        if got != expected:
+            mismatches += 1
+            if mismatches <= 20:
+                print(
+                    f"Divergência: referência={expected} rubrica={got} "
+                    f"avaliação={vars(evaluation)} gabarito={vars(answer_key)} uvas={wine_grapes}"
+                )
+
+    print(f"{pairs} pares comparados, {mismatches} divergência(s).")
+    return mismatches
+
+
+TOTALS_COLUMNS = (
+    "participant_id",
+    "event_id",
+    "score_total",
+    "score_max_total",
+    "percentual",
+    "badge",
+    "badge_key",
+)
+
+
+def _snapshot_totals(db, event_id) -> dict:
+    rows = db.query(ParticipantEvent).filter(ParticipantEvent.event_id == event_id).all()
+    return {
+        row.participant_id: tuple(getattr(row, col) for col in TOTALS_COLUMNS)
+        for row in rows
+    }
+
+
+def check_upsert_parity(db, event_id) -> int:
+    """
+    Executa os dois caminhos de gravação dos totais (ON CONFLICT e lote
+    SELECT + insert/update) sobre o estado atual do evento, cada um em uma
+    transação desfeita ao final, e compara as linhas resultantes.
+    Cobre o caminho de update, que antes não atualizava badge_key.
+    """
+    event_id = UUID(str(event_id))
+    rows = ScoreService.compute_event_totals(db, event_id)
+
+    snapshots = []
+    for upsert in (ScoreService._upsert_on_conflict, ScoreService._upsert_batched):
+        try:
+            upsert(db, rows)
+            db.flush()
+            db.expire_all()
+            snapshots.append(_snapshot_totals(db, event_id))
+        finally:
+            db.rollback()
+
+    expected = {
+        row["participant_id"]: tuple(row[col] for col in TOTALS_COLUMNS) for row in rows
+    }
+
+    mismatches = 0
+    for participant_id, values in expected.items():
+        on_conflict, batched = (s.get(participant_id) for s in snapshots)
+        if not (values == on_conflict == batched):
+            mismatches += 1
+            print(
+                f"Divergência em {participant_id}: esperado={values} "
+                f"on_conflict={on_conflict} lote={batched}"
+            )
+
+    print(f"{len(expected)} participantes comparados, {mismatches} divergência(s).")
+    return mismatches
+
+
+def check_event_totals(db, event_id) -> int:
+    """
+    Compara os totais gravados em ParticipantEvent (modo incremental) com
+    um recálculo completo do evento.
+    """
+    mismatches = ScoreService.check_event_totals(db, UUID(str(event_id)))
+
+    for participant_id, stored, expected in mismatches:
+        print(f"Divergência em {participant_id}: gravado={stored} recalculado={expected}")
+
+    print(f"{len(mismatches)} divergência(s).")
+    return len(mismatches)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    parity = sub.add_parser("parity", help="cálculo em lote x referência")
+    parity.add_argument("round_id")
+
+    batch = sub.add_parser("batch", help="BatchScorer x referência")
+    batch.add_argument("event_ids", nargs="*")
+
+    upsert = sub.add_parser("upsert", help="ON CONFLICT x lote nos totais do evento")
+    upsert.add_argument("event_id")
+
+    totals = sub.add_parser("totals", help="totais incrementais x recálculo completo")
+    totals.add_argument("event_id")
+
+    rubric = sub.add_parser("rubric", help="rubrica x referência em pares aleatórios")
+    rubric.add_argument("--pairs", type=int, default=20000)
+    rubric.add_argument("--seed", type=int)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "rubric":
+        return 1 if check_rubric_parity(args.pairs, args.seed) else 0
+
+    db = SessionLocal()
+    try:
+        if args.command == "parity":
+            failures = check_round_parity(db, args.round_id)
+        elif args.command == "batch":
+            failures = check_batch_parity(db, args.event_ids or None)
+        elif args.command == "upsert":
+            failures = check_upsert_parity(db, args.event_id)
+        elif args.command == "totals":
+            failures = check_event_totals(db, args.event_id)
+    finally:
+        db.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
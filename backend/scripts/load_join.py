@@ -0,0 +1,88 @@
+"""
+Teste de carga do POST /participants/join: simula a abertura do QR code,
+com centenas de participantes entrando ao mesmo tempo (parte deles
+repetindo o nome, como quem recarrega a página). Confere também que
+cada nome virou um único participante.
+
+Precisa da API rodando. Cria um evento novo, a não ser que --event-code
+seja informado.
+
+Uso:
+    python -m scripts.load_join [--url http://localhost:10000/api/v1]
+        [--requests 500] [--concurrency 500] [--repeat-ratio 0.2]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import httpx
+
+
+async def join(client: httpx.AsyncClient, url: str, name: str, event_code: str, latencies: list):
+    t0 = time.perf_counter()
+    try:
+        r = await client.post(f"{url}/participants/join", json={"name": name, "event_code": event_code})
+    except httpx.HTTPError as exc:
+        return name, type(exc).__name__, None
+    latencies.append((time.perf_counter() - t0) * 1000)
+    participant_id = r.json().get("participant_id") if r.status_code == 200 else None
+    return name, r.status_code, participant_id
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        event_code = args.event_code
+        if not event_code:
+            event_code = f"LOAD-{uuid.uuid4().hex[:6]}"
+            r = await client.post(f"{args.url}/events", json={"name": "Load test", "access_code": event_code})
+            r.raise_for_status()
+
+        unique = max(1, int(args.requests * (1 - args.repeat_ratio)))
+        names = [f"Participante {i}" for i in range(unique)]
+        names += random.choices(names, k=args.requests - unique)
+        random.shuffle(names)
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def limited(name):
+            async with semaphore:
+                return await join(client, args.url, name, event_code, latencies)
+
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(limited(name) for name in names))
+        elapsed = time.perf_counter() - t0
+
+    statuses = Counter(status for _, status, _ in results)
+    ids_by_name = defaultdict(set)
+    for name, _, participant_id in results:
+        if participant_id:
+            ids_by_name[name].add(participant_id)
+    duplicated = [name for name, ids in ids_by_name.items() if len(ids) > 1]
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    print(f"{args.requests} joins ({unique} nomes), concorrência {args.concurrency}, evento {event_code}")
+    print(f"tempo total: {elapsed:.2f}s -> {args.requests / elapsed:.0f} joins/s")
+    print(f"latência: p50={quantiles[49]:.0f}ms p95={quantiles[94]:.0f}ms p99={quantiles[98]:.0f}ms")
+    print(f"respostas: {dict(statuses)}")
+    print(f"nomes com mais de um participante: {len(duplicated)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:10000/api/v1")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--repeat-ratio", type=float, default=0.2)
+    parser.add_argument("--event-code")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Recalcula em lote (BatchScorer) os scores de todos os eventos ou dos
+eventos informados e mostra o tempo gasto.
+
+Uso:
+    python -m scripts.rescore_events [--dry-run] [<event_id> ...]
+"""
+import argparse
+import time
+
+from app.core.database import SessionLocal
+from app.models.event import Event  # noqa: F401 (registra os mappers)
+from app.models.participant import Participant  # noqa: F401
+from app.services.batch_scorer import BatchScorer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("event_ids", nargs="*")
+    parser.add_argument("--dry-run", action="store_true", help="só calcula, não grava")
+    args = parser.parse_args(argv)
+
+    event_ids = args.event_ids or None
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        if args.dry_run:
+            result = BatchScorer.score(db, event_ids)
+            changed = int((result.scores != result.current).sum())
+            total = len(result.evaluation_ids)
+        else:
+            changed = BatchScorer.rescore(db, event_ids)
+            total = None
+        elapsed = time.perf_counter() - t0
+    finally:
+        db.close()
+
+    if total is not None:
+        print(f"{total} avaliações pontuadas, {changed} com score diferente do gravado.")
+    else:
+        print(f"{changed} avaliações atualizadas.")
+    print(f"Tempo: {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
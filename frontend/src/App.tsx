@@ -1,5 +1,6 @@
 import { useEffect, useRef, useState } from "react";
 import { apiGet } from "./api/client";
+import { watchEvent } from "./api/eventStream";
 import Evaluation from "./pages/Evaluation";
 import Events from "./pages/Events";
 import Login from "./pages/Login";
@@ -8,6 +9,7 @@ import Ranking from "./pages/Ranking";
 import Rounds from "./pages/Rounds";
 import Winner from "./pages/Winner";
 import "./styles/ui.css";
+import type { EventStatusResponse } from "./types/event";
 import type { EvaluationResultResponse } from "./types/results";
 import { storage } from "./utils/storage";
 import EventAnswerKey from "./pages/EventAnswerKey";
@@ -59,16 +61,14 @@ export default function App() {
 
     async function loadEventStatus() {
       try {
-        const events = await apiGet<any[]>("/events");
-        const ev = events.find(
-          (e) => e.id === participant.info.event_id
+        const ev = await apiGet<EventStatusResponse>(
+          `/events/${participant.info.event_id}/status`
         );
 
-        const isClosed = ev ? !ev.is_open : true;
-        setEventIsOpen(!isClosed);
+        setEventIsOpen(ev.is_open);
 
         // Quando evento fecha, busca todos os rounds do evento
-        if (ev && !ev.is_open && roundIds.length === 0) {
+        if (!ev.is_open && roundIds.length === 0) {
           const rounds = await apiGet<any[]>(
             `/rounds?event_id=${participant.info.event_id}`
           );
@@ -81,15 +81,14 @@ export default function App() {
 
     loadEventStatus();
 
-    // Para o polling se o evento já está fechado e roundIds já foram carregados
+    // Para de acompanhar se o evento já está fechado e roundIds já foram carregados
     if (eventIsOpen === false && roundIds.length > 0) {
       return;
     }
 
-    // Faz polling a cada 3 segundos para verificar se o evento foi fechado
-    const interval = setInterval(loadEventStatus, 3000);
-
-    return () => clearInterval(interval);
+    // Recarrega o status a cada notificação do canal SSE do evento
+    // (polling de /status, que responde 304 sem mudança, só como fallback)
+    return watchEvent(participant.info.event_id, loadEventStatus);
   }, [user, roundIds.length, eventIsOpen]);
 
   async function loadParticipantResults() {
@@ -101,12 +100,8 @@ export default function App() {
     setResultError("");
 
     try {
-      const responses = await Promise.all(
-        roundIds.map(roundId =>
-          apiGet<EvaluationResultResponse>(
-            `/results/my-evaluation?round_id=${roundId}`
-          )
-        )
+      const responses = await apiGet<EvaluationResultResponse[]>(
+        "/results/my-event-evaluations"
       );
 
       setParticipantResults(responses);
@@ -1,7 +1,7 @@
 import { NetworkError } from "../errors/NetworkError";
 import { storage } from "../utils/storage";
 
-const API_BASE = import.meta.env.VITE_API_BASE ?? "http://localhost:10000/api/v1";
+export const API_BASE = import.meta.env.VITE_API_BASE ?? "http://localhost:10000/api/v1";
 
 export async function apiPost<TReq, TRes>(path: string, body: TReq): Promise<TRes> {
   try {
@@ -32,19 +32,32 @@ export async function apiPost<TReq, TRes>(path: string, body: TReq): Promise<TRe
   }
 }
 
-function getParticipantId() {
-  return storage.getParticipantId();
+// Token assinado devolvido por /participants/join e /auth/login; o header
+// X-Participant-Id fica só para sessões abertas antes dele existir.
+function authHeaders(): Record<string, string> {
+  const token = storage.getToken();
+  if (token) {
+    return { Authorization: `Bearer ${token}` };
+  }
+  const participantId = storage.getParticipantId();
+  return participantId ? { "X-Participant-Id": participantId } : {};
 }
 
-export async function apiGet<TRes>(path: string): Promise<TRes> {
-  const participantId = getParticipantId();
+// Token recusado (chave trocada no servidor, expirado, revogado): descarta
+// e repete uma vez com o header antigo, que consulta o banco.
+async function authFetch(url: string, headers: Record<string, string> = {}): Promise<Response> {
+  const hadToken = storage.getToken() !== null;
+  const res = await fetch(url, { headers: { ...authHeaders(), ...headers } });
+  if (res.status !== 401 || !hadToken) {
+    return res;
+  }
+  storage.clearToken();
+  return fetch(url, { headers: { ...authHeaders(), ...headers } });
+}
 
+export async function apiGet<TRes>(path: string): Promise<TRes> {
   try {
-    const res = await fetch(`${API_BASE}${path}`, {
-      headers: {
-        ...(participantId ? { "X-Participant-Id": participantId } : {}),
-      },
-    });
+    const res = await authFetch(`${API_BASE}${path}`);
 
     if (!res.ok) {
       const contentType = res.headers.get("content-type") ?? "";
@@ -115,17 +128,9 @@ export async function apiDownload(
   path: string,
   filename: string
 ): Promise<void> {
-  const participantId = getParticipantId();
-
   try {
-    const res = await fetch(`${API_BASE}${path}`, {
-      method: "GET",
-      headers: {
-        ...(participantId
-          ? { "X-Participant-Id": participantId }
-          : {}),
-        Accept: "application/pdf",
-      },
+    const res = await authFetch(`${API_BASE}${path}`, {
+      Accept: "application/pdf",
     });
 
     if (!res.ok) {
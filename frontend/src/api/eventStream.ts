@@ -0,0 +1,54 @@
+import { API_BASE } from "./client";
+
+// Notificações publicadas em GET /events/{id}/stream (app/core/broker.py)
+const EVENT_TYPES = [
+  "event_opened",
+  "event_closed",
+  "round_opened",
+  "round_closed",
+  "answer_released",
+];
+
+const FALLBACK_POLL_MS = 3000;
+
+/**
+ * Chama `onChange` quando o evento muda, recebido por Server-Sent Events.
+ * Também chama ao (re)conectar, já que notificações enviadas com a conexão
+ * caída se perdem. Sem EventSource ou com o canal fora do ar, volta ao
+ * polling a cada 3s até reconectar. Retorna a função que encerra.
+ */
+export function watchEvent(eventId: string, onChange: () => void): () => void {
+  let interval: ReturnType<typeof setInterval> | null = null;
+
+  function startPolling() {
+    if (interval === null) {
+      interval = setInterval(onChange, FALLBACK_POLL_MS);
+    }
+  }
+
+  function stopPolling() {
+    if (interval !== null) {
+      clearInterval(interval);
+      interval = null;
+    }
+  }
+
+  if (typeof EventSource === "undefined") {
+    startPolling();
+    return stopPolling;
+  }
+
+  const source = new EventSource(`${API_BASE}/events/${eventId}/stream`);
+  source.onopen = () => {
+    stopPolling();
+    onChange();
+  };
+  // o EventSource reconecta sozinho (retry do servidor); enquanto isso, polling
+  source.onerror = () => startPolling();
+  EVENT_TYPES.forEach((type) => source.addEventListener(type, onChange));
+
+  return () => {
+    stopPolling();
+    source.close();
+  };
+}
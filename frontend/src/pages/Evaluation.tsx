@@ -1,7 +1,9 @@
 import { useEffect, useMemo, useRef, useState } from "react";
 import { apiGet, apiPost } from "../api/client";
+import { watchEvent } from "../api/eventStream";
 import { storage, type EvaluationDraft } from "../utils/storage";
 import "../styles/evaluation.css";
+import type { EventStatusResponse } from "../types/event";
 import type {
   ColorType,
   Condition,
@@ -412,21 +414,24 @@ export default function Evaluation({ participantId, eventId, initialIsAnswerKey,
   useEffect(() => {
     if (!waiting || !onEventClosed) return;
 
-    const interval = setInterval(async () => {
+    let closed = false;
+
+    // status recarregado a cada notificação SSE do evento (polling só como fallback)
+    const stop = watchEvent(eventId, async () => {
       try {
-        const events = await apiGet<any[]>("/events");
-        const event = events.find(e => e.id === eventId);
+        const event = await apiGet<EventStatusResponse>(`/events/${eventId}/status`);
 
-        if (event && event.is_open === false) {
-          clearInterval(interval);
+        if (event.is_open === false && !closed) {
+          closed = true;
+          stop();
           onEventClosed();
         }
       } catch {
         // ignora erro momentâneo
       }
-    }, 3000); // 3 segundos (ótimo equilíbrio)
+    });
 
-    return () => clearInterval(interval);
+    return stop;
   }, [waiting, eventId, onEventClosed]);
 
   async function loadPendingRound() {
@@ -27,8 +27,12 @@ export default function Login({
     try {
       if (userType === "sommelier") {
         try {
-          const data = await apiPost("/auth/login", { name, password });
+          const data = await apiPost<{ name: string; password: string }, any>(
+            "/auth/login",
+            { name, password }
+          );
           setError(null);
+          storage.setToken(data.token);
           onLogin("sommelier", data);
         } catch (err: any) {
           setError(err?.message || "Erro ao logar como sommelier");
@@ -42,6 +46,7 @@ export default function Login({
           setError(null);
           onLogin("participant", data);
           storage.setParticipantId(data.participant_id);
+          storage.setToken(data.token);
           storage.setUserType("participant");
         } catch (err: any) {
           setError(err?.message || "Erro ao participar do evento");
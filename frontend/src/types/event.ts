@@ -18,4 +18,12 @@ export type EventWinnerResponse = {
 export interface EventWinnersResponse {
   event_id: string;
   winners: EventWinnerResponse[];
-}
\ No newline at end of file
+}
+// GET /events/{id}/status: responde 304 (ETag) enquanto o evento não muda;
+// o cache HTTP do navegador revalida sozinho e devolve o corpo guardado
+export interface EventStatusResponse {
+  event_id: string;
+  is_open: boolean;
+  open_round: { id: string; name: string; position: number } | null;
+  version: number;
+}
@@ -1,4 +1,5 @@
 const PARTICIPANT_KEY = "participant_id";
+const TOKEN_KEY = "token";
 const USER_TYPE_KEY = "user_type";
 const EVALUATION_DRAFT_KEY = "evaluation_draft";
 
@@ -41,6 +42,18 @@ export const storage = {
         return sessionStorage.getItem(PARTICIPANT_KEY);
     },
 
+    setToken(token: string) {
+        sessionStorage.setItem(TOKEN_KEY, token);
+    },
+
+    getToken(): string | null {
+        return sessionStorage.getItem(TOKEN_KEY);
+    },
+
+    clearToken() {
+        sessionStorage.removeItem(TOKEN_KEY);
+    },
+
     clearParticipant() {
         sessionStorage.removeItem(PARTICIPANT_KEY);
         localStorage.removeItem(USER_TYPE_KEY);